@@ -1,6 +1,13 @@
 // Chat state
 let currentConversationId = null;
 
+// Pagination state: cursors point at the next (older) page, null when exhausted
+let conversationsCursor = null;
+let messagesCursor = null;
+let loadingMoreConversations = false;
+let loadingMoreMessages = false;
+const SCROLL_THRESHOLD_PX = 80;
+
 $(document).ready(function () {
     loadConversations();
 
@@ -14,6 +21,20 @@ $(document).ready(function () {
         e.preventDefault();
         sendMessage();
     });
+
+    // Infinite scroll: older chats at the bottom of the sidebar,
+    // older messages at the top of the chatbox
+    $("#chatHistory").on("scroll", function () {
+        if (this.scrollTop + this.clientHeight >= this.scrollHeight - SCROLL_THRESHOLD_PX) {
+            loadMoreConversations();
+        }
+    });
+
+    $("#chatbox").on("scroll", function () {
+        if (this.scrollTop <= SCROLL_THRESHOLD_PX) {
+            loadOlderMessages();
+        }
+    });
 });
 
 async function loadConversations() {
@@ -22,6 +43,7 @@ async function loadConversations() {
         const data = await response.json();
 
         if (data.success) {
+            conversationsCursor = data.next_cursor;
             displayConversations(data.conversations);
 
             // Load the first conversation or create new one
@@ -45,6 +67,12 @@ function displayConversations(conversations) {
         return;
     }
 
+    appendConversations(conversations);
+}
+
+function appendConversations(conversations) {
+    const historyContainer = $("#chatHistory");
+
     conversations.forEach(conv => {
         const chatItem = $(`
             <div class="chat-history-item" data-conv-id="${conv.id}">
@@ -52,6 +80,10 @@ function displayConversations(conversations) {
             </div>
         `);
 
+        if (conv.id === currentConversationId) {
+            chatItem.addClass("active");
+        }
+
         chatItem.on("click", function () {
             loadConversation(conv.id);
         });
@@ -60,6 +92,25 @@ function displayConversations(conversations) {
     });
 }
 
+async function loadMoreConversations() {
+    if (!conversationsCursor || loadingMoreConversations) return;
+    loadingMoreConversations = true;
+
+    try {
+        const response = await fetch(`/get-conversations?cursor=${encodeURIComponent(conversationsCursor)}`);
+        const data = await response.json();
+
+        if (data.success) {
+            conversationsCursor = data.next_cursor;
+            appendConversations(data.conversations);
+        }
+    } catch (error) {
+        console.error('Error loading more conversations:', error);
+    } finally {
+        loadingMoreConversations = false;
+    }
+}
+
 async function createNewConversation() {
     try {
         const response = await fetch('/new-conversation', {
@@ -71,6 +122,7 @@ async function createNewConversation() {
 
         if (data.success) {
             currentConversationId = data.conversation_id;
+            messagesCursor = null;
 
             // Clear chatbox
             $("#chatbox").html(`
@@ -95,6 +147,7 @@ async function loadConversation(convId) {
 
         if (data.success) {
             currentConversationId = convId;
+            messagesCursor = data.next_cursor;
 
             // Clear chatbox
             $("#chatbox").empty();
@@ -126,6 +179,32 @@ async function loadConversation(convId) {
     }
 }
 
+async function loadOlderMessages() {
+    if (!messagesCursor || loadingMoreMessages) return;
+    loadingMoreMessages = true;
+    const convId = currentConversationId;
+
+    try {
+        const response = await fetch(`/load-conversation/${convId}?cursor=${encodeURIComponent(messagesCursor)}`);
+        const data = await response.json();
+
+        // Ignore the page if the user switched conversations meanwhile
+        if (data.success && convId === currentConversationId) {
+            messagesCursor = data.next_cursor;
+
+            // Prepend while keeping the visible messages in place
+            const chatbox = document.getElementById("chatbox");
+            const previousHeight = chatbox.scrollHeight;
+            $("#chatbox").prepend(data.messages.map(msg => renderMessage(msg.sender, msg.content)).join(""));
+            chatbox.scrollTop += chatbox.scrollHeight - previousHeight;
+        }
+    } catch (error) {
+        console.error('Error loading older messages:', error);
+    } finally {
+        loadingMoreMessages = false;
+    }
+}
+
 async function sendMessage() {
     const rawText = $("#text").val().trim();
     if (rawText === "" || !currentConversationId) return;
@@ -145,7 +224,7 @@ async function sendMessage() {
     scrollToBottom();
 
     try {
-        const response = await fetch('/send-message', {
+        const response = await fetch('/send-message-stream', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
@@ -154,20 +233,19 @@ async function sendMessage() {
             })
         });
 
-        const data = await response.json();
-
-        $(`#${loadingId}`).remove();
-
-        if (data.success) {
-            appendMessage("bot", data.response);
-            scrollToBottom();
-
-            // Reload conversations to update title
-            loadConversations();
-        } else {
+        const contentType = response.headers.get('Content-Type') || '';
+        if (!contentType.startsWith('text/event-stream')) {
+            const data = await response.json();
+            $(`#${loadingId}`).remove();
             appendMessage("bot", "Sorry, something went wrong: " + data.message);
             scrollToBottom();
+            return;
         }
+
+        await renderStreamedReply(response, loadingId);
+
+        // Reload conversations to update title
+        loadConversations();
     } catch (error) {
         $(`#${loadingId}`).remove();
         appendMessage("bot", "Network error. Please try again.");
@@ -175,15 +253,61 @@ async function sendMessage() {
     }
 }
 
+// Render a Server-Sent Events reply into the typing indicator as it arrives
+async function renderStreamedReply(response, loadingId) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    const messageContent = $(`#${loadingId} .message-content`);
+    let buffer = "";
+    let reply = "";
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            if (!rawEvent.startsWith("data: ")) continue;
+
+            const event = JSON.parse(rawEvent.slice(6));
+            if (event.delta) {
+                if (reply === "") {
+                    $(`#${loadingId}`).removeClass("loading");
+                }
+                reply += event.delta;
+                messageContent.html(formatMessage(reply));
+                scrollToBottom();
+            } else if (event.error) {
+                $(`#${loadingId}`).remove();
+                appendMessage("bot", "Sorry, something went wrong: " + event.error);
+                scrollToBottom();
+                return;
+            }
+        }
+    }
+    $(`#${loadingId}`).removeAttr("id");
+}
+
 function appendMessage(sender, content) {
+    $("#chatbox").append(renderMessage(sender, content));
+}
+
+function renderMessage(sender, content) {
     const messageClass = sender === "user" ? "user-message" : "bot-message";
-    const formattedContent = content.replace(/\n/g, "<br>");
-    const messageHtml = `
+    const formattedContent = formatMessage(content);
+    return `
         <div class="message ${messageClass}">
             <div class="message-content">${formattedContent}</div>
         </div>
     `;
-    $("#chatbox").append(messageHtml);
+}
+
+function formatMessage(content) {
+    return content.replace(/\n/g, "<br>");
 }
 
 function scrollToBottom() {
@@ -16,6 +16,10 @@ const jobDescription = document.getElementById('jobDescription');
 let selectedFiles = [];
 let currentResults = [];
 
+// Batches larger than this are queued server-side and polled for progress
+const ASYNC_UPLOAD_THRESHOLD = 3;
+const JOB_POLL_INTERVAL_MS = 1000;
+
 // Browse button click
 browseBtn.addEventListener('click', () => {
     resumeFiles.click();
@@ -109,6 +113,19 @@ analyzeBtn.addEventListener('click', async () => {
     analyzeBtn.style.display = 'none';
     uploadProgress.style.display = 'block';
 
+    // Upload files
+    const formData = new FormData();
+    formData.append('job_description', jobDescription.value);
+    selectedFiles.forEach(file => {
+        formData.append('resumes', file);
+    });
+
+    if (selectedFiles.length > ASYNC_UPLOAD_THRESHOLD) {
+        formData.append('async', '1');
+        await runAnalysisJob(formData);
+        return;
+    }
+
     // Simulate progress
     let progress = 0;
     const progressInterval = setInterval(() => {
@@ -118,13 +135,6 @@ analyzeBtn.addEventListener('click', async () => {
         }
     }, 300);
 
-    // Upload files
-    const formData = new FormData();
-    formData.append('job_description', jobDescription.value);
-    selectedFiles.forEach(file => {
-        formData.append('resumes', file);
-    });
-
     try {
         const response = await fetch('/upload-resume', {
             method: 'POST',
@@ -152,6 +162,49 @@ analyzeBtn.addEventListener('click', async () => {
     }
 });
 
+// Queue a large batch and poll the job until every file is analyzed
+async function runAnalysisJob(formData) {
+    try {
+        const response = await fetch('/upload-resume', {
+            method: 'POST',
+            body: formData
+        });
+        const data = await response.json();
+
+        if (!data.success) {
+            alert('Error: ' + data.message);
+            resetUpload();
+            return;
+        }
+
+        while (true) {
+            const statusResponse = await fetch(data.status_url);
+            const job = await statusResponse.json();
+
+            if (!job.success) {
+                alert('Error: ' + job.message);
+                resetUpload();
+                return;
+            }
+
+            progressFill.style.width = (job.total ? (job.completed / job.total) * 100 : 0) + '%';
+
+            if (job.status === 'completed') {
+                currentResults = job.results;
+                setTimeout(() => {
+                    displayResults(job.results, job.errors || []);
+                }, 500);
+                return;
+            }
+
+            await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+        }
+    } catch (error) {
+        alert('Upload failed. Please try again.');
+        resetUpload();
+    }
+}
+
 // Display results
 function displayResults(results, errors) {
     // Hide upload section
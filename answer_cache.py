@@ -0,0 +1,163 @@
+import hashlib
+import math
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from bow_encoder import lemmatize
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+class PromptVectorizer:
+    """Local, offline embedding of a prompt.
+
+    Known words map to their column in the intent vocabulary (words.pkl);
+    anything else is hashed into `oov_buckets` extra columns, so questions
+    about topics the intent model never saw still compare meaningfully.
+    Adjacent word pairs are hashed into the same extra columns, so prompts
+    with the same words in a different order ("convert USD to EUR" and
+    "convert EUR to USD") are not near-duplicates. Vectors are sparse
+    ({column: weight} with only the prompt's columns) and L2-normalized,
+    so their dot product is the cosine similarity.
+    """
+
+    def __init__(self, words, oov_buckets=4096):
+        self.index = {w: i for i, w in enumerate(words)}
+        self.oov_buckets = oov_buckets
+        self.size = len(self.index) + oov_buckets
+
+    def tokens(self, text):
+        return [lemmatize(t) for t in TOKEN_PATTERN.findall(text.lower())]
+
+    def _hashed_column(self, feature):
+        return len(self.index) + zlib.crc32(feature.encode("utf-8")) % self.oov_buckets
+
+    def vectorize(self, text):
+        tokens = self.tokens(text)
+        vector = {}
+        for token in tokens:
+            column = self.index.get(token)
+            if column is None:
+                column = self._hashed_column(token)
+            vector[column] = vector.get(column, 0.0) + 1.0
+        for first, second in zip(tokens, tokens[1:]):
+            # tokens never contain spaces, so bigrams hash apart from words
+            column = self._hashed_column(f"{first} {second}")
+            vector[column] = vector.get(column, 0.0) + 1.0
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return {column: weight / norm for column, weight in vector.items()} if norm else vector
+
+
+class SemanticAnswerCache:
+    """In-memory cache of LLM answers looked up by prompt similarity.
+
+    Entries are partitioned by scope (the user, unless `shared`) and by a
+    fingerprint of the last `context_messages` turns of the conversation,
+    so an answer is only reused for a similar question asked in the same
+    context. Within a partition the most similar entry at or above
+    `threshold` is a hit; an inverted index from vector columns to entries
+    means only entries sharing a word with the prompt are scored. Entries
+    expire after `ttl` seconds and the least recently used are evicted
+    beyond `max_entries`.
+    """
+
+    def __init__(self, vectorizer, threshold=0.95, ttl=3600, max_entries=5000, shared=False, context_messages=2):
+        self.vectorizer = vectorizer
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.shared = shared
+        self.context_messages = context_messages
+        self._lock = threading.Lock()
+        # (partition, prompt) -> (vector, answer, expires_at), oldest use first
+        self._entries = OrderedDict()
+        # partition -> column -> {key: weight}
+        self._partitions = {}
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def _partition(self, user_id, history):
+        """Cache partition for a user and the tail of a conversation's stored
+        messages (rows with `sender` and `content`, oldest first)"""
+        digest = hashlib.sha256()
+        digest.update(b"*" if self.shared else str(user_id).encode("utf-8"))
+        tail = history[-self.context_messages:] if self.context_messages else []
+        for message in tail:
+            digest.update(b"\0" + message['sender'].encode("utf-8") + b"\0")
+            digest.update(message['content'].strip().lower().encode("utf-8"))
+        return digest.hexdigest()
+
+    def _remove(self, key):
+        vector = self._entries.pop(key)[0]
+        postings = self._partitions[key[0]]
+        for column in vector:
+            keys = postings[column]
+            del keys[key]
+            if not keys:
+                del postings[column]
+        if not postings:
+            del self._partitions[key[0]]
+
+    def get(self, user_id, history, prompt):
+        """The cached answer to a similar prompt in the same context, or None"""
+        partition = self._partition(user_id, history)
+        vector = self.vectorizer.vectorize(prompt)
+        now = time.time()
+        with self._lock:
+            postings = self._partitions.get(partition, {})
+            scores = {}
+            for column, weight in vector.items():
+                for key, cached_weight in postings.get(column, {}).items():
+                    scores[key] = scores.get(key, 0.0) + weight * cached_weight
+            best_key, best_score = None, self.threshold
+            for key, score in scores.items():
+                if score < best_score:
+                    continue
+                if self._entries[key][2] <= now:
+                    self._remove(key)
+                    self._expirations += 1
+                    continue
+                best_key, best_score = key, score
+            if best_key is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries.move_to_end(best_key)
+            return self._entries[best_key][1]
+
+    def put(self, user_id, history, prompt, answer):
+        if not answer:
+            return
+        partition = self._partition(user_id, history)
+        key = (partition, prompt.strip().lower())
+        vector = self.vectorizer.vectorize(prompt)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (vector, answer, time.time() + self.ttl)
+            postings = self._partitions.setdefault(partition, {})
+            for column, weight in vector.items():
+                postings.setdefault(column, {})[key] = weight
+            self._stores += 1
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'hits': self._hits,
+                'misses': self._misses,
+                'stores': self._stores,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+            }
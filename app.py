@@ -1,12 +1,29 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash, Response, stream_with_context, g
+from flask.json.provider import DefaultJSONProvider
+from flask_session import Session
 import google.generativeai as genai
 import mysql.connector
-from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
+import contextvars
+import io
 import os
+import base64
+import re
+import json
+import time
+import threading
 from datetime import datetime
-import PyPDF2
-import docx
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from conversation_cache import ConversationOwnerCache
+from db_pool import ConnectionPool, PoolTimeout
+from gemini_client import GeminiUnavailable, ResilientGeminiModel
+import metrics
+from passwords import PasswordHasher, PasswordHasherBusy
+from resume_cache import ResumeAnalysisCache, cache_key
+from resume_jobs import ResumeJobQueue
+from text_extraction import extract_text_from_pdf, extract_text_from_docx, start_pdf_workers
+from upload_retention import UploadSweeper
 
 # Load environment variables from .env file
 try:
@@ -15,10 +32,41 @@ try:
 except ImportError:
     pass  # python-dotenv not installed, fall back to os.environ
 
+class TimedJSONProvider(DefaultJSONProvider):
+    """Records jsonify() encoding as the json.encode span"""
+
+    def response(self, *args, **kwargs):
+        with metrics.span('json.encode'):
+            return super().response(*args, **kwargs)
+
 app = Flask(__name__)
+app.json = TimedJSONProvider(app)
 # Use environment variable for secret key in production
 app.secret_key = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')  # Change this in production!
 
+# Sessions are stored server-side and the cookie only carries a random session
+# id. "filesystem" shares them between the workers of one host, "redis" (any
+# Redis-compatible server) between hosts, and "cookie" keeps Flask's signed
+# cookie sessions.
+SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'filesystem').lower()
+if SESSION_BACKEND == 'redis':
+    import redis
+    app.config['SESSION_TYPE'] = 'redis'
+    app.config['SESSION_REDIS'] = redis.from_url(os.environ.get('SESSION_REDIS_URL', 'redis://localhost:6379/0'))
+elif SESSION_BACKEND == 'filesystem':
+    from cachelib.file import FileSystemCache
+    app.config['SESSION_TYPE'] = 'cachelib'
+    app.config['SESSION_CACHELIB'] = FileSystemCache(
+        cache_dir=os.environ.get('SESSION_FILE_DIR', 'flask_session'),
+        threshold=int(os.environ.get('SESSION_FILE_THRESHOLD', 20000))
+    )
+elif SESSION_BACKEND != 'cookie':
+    raise ValueError(f"Unknown SESSION_BACKEND: {SESSION_BACKEND}")
+if SESSION_BACKEND != 'cookie':
+    # Like cookie sessions, end the session when the browser closes
+    app.config['SESSION_PERMANENT'] = False
+    Session(app)
+
 # Configure upload folder
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'doc'}
@@ -26,66 +74,242 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
+# Uploads are parsed from memory; copies are kept on disk only when retention
+# is enabled, and a background sweeper trims UPLOAD_FOLDER by age and size
+UPLOAD_RETENTION_ENABLED = os.environ.get('UPLOAD_RETENTION_ENABLED', 'False').lower() in ('1', 'true', 'yes')
+upload_sweeper = None
+if UPLOAD_RETENTION_ENABLED:
+    upload_sweeper = UploadSweeper(
+        UPLOAD_FOLDER,
+        max_age=int(os.environ.get('UPLOAD_RETENTION_MAX_AGE', 7 * 86400)),
+        max_bytes=int(os.environ.get('UPLOAD_RETENTION_MAX_BYTES', 1024 ** 3)),
+        interval=int(os.environ.get('UPLOAD_RETENTION_SWEEP_INTERVAL', 600))
+    )
+
+# Resume extraction and analysis run on a bounded, process-wide worker pool
+RESUME_ANALYSIS_WORKERS = int(os.environ.get('RESUME_ANALYSIS_WORKERS', 4))
+RESUME_ANALYSIS_TIMEOUT = float(os.environ.get('RESUME_ANALYSIS_TIMEOUT', 60))
+resume_executor = ThreadPoolExecutor(max_workers=RESUME_ANALYSIS_WORKERS, thread_name_prefix='resume-analysis')
+
 # Configure the Gemini API (use env var in production)
 API_KEY = os.environ.get('GENAI_API_KEY')
+# GEMINI_FAKE=1 swaps in an offline fake backend for load tests (see fake_gemini.py)
+GEMINI_FAKE = os.environ.get('GEMINI_FAKE', 'False').lower() in ('1', 'true', 'yes')
 model = None
 
 def get_genai_model():
-    """Lazy-load Gemini model, handle missing API key gracefully."""
+    """Lazy-load Gemini model, handle missing API key gracefully.
+
+    The model is wrapped with per-call timeouts, retries, a process-wide
+    concurrency limit and a circuit breaker (see gemini_client.py).
+    """
     global model
     if model is not None:
         return model
     
-    if not API_KEY:
+    if not API_KEY and not GEMINI_FAKE:
         return None
     
     try:
-        genai.configure(api_key=API_KEY)
-        model = genai.GenerativeModel('gemini-2.5-flash')
+        if GEMINI_FAKE:
+            from fake_gemini import FakeGeminiModel
+            backend = FakeGeminiModel(
+                latency_ms=float(os.environ.get('GEMINI_FAKE_LATENCY_MS', 500)),
+                error_rate=float(os.environ.get('GEMINI_FAKE_ERROR_RATE', 0))
+            )
+        else:
+            genai.configure(api_key=API_KEY)
+            backend = genai.GenerativeModel('gemini-2.5-flash')
+        model = ResilientGeminiModel(
+            backend,
+            timeout=float(os.environ.get('GEMINI_TIMEOUT', 30)),
+            deadline=float(os.environ.get('GEMINI_DEADLINE', 60)),
+            max_retries=int(os.environ.get('GEMINI_MAX_RETRIES', 3)),
+            max_concurrency=int(os.environ.get('GEMINI_MAX_CONCURRENCY', 8)),
+            queue_timeout=float(os.environ.get('GEMINI_QUEUE_TIMEOUT', 5)),
+            rate_per_minute=int(os.environ.get('GEMINI_RATE_PER_MINUTE', 0)),
+            breaker_failures=int(os.environ.get('GEMINI_BREAKER_FAILURES', 5)),
+            breaker_reset=float(os.environ.get('GEMINI_BREAKER_RESET', 30))
+        )
         return model
     except Exception as e:
         print(f"Error initializing Gemini model: {e}")
         return None
 
+# Optional local intent router that answers trivial messages without Gemini
+INTENT_ROUTER_ENABLED = os.environ.get('INTENT_ROUTER_ENABLED', 'False').lower() in ('1', 'true', 'yes')
+INTENT_ROUTER_THRESHOLD = float(os.environ.get('INTENT_ROUTER_THRESHOLD', 0.9))
+INTENT_ROUTER_TAGS = [t.strip() for t in os.environ.get('INTENT_ROUTER_TAGS', 'greetings,goodbye,thanks').split(',') if t.strip()]
+intent_router = None
+
+def get_intent_router():
+    """Lazy-load the intent router; None when disabled or its artifacts are missing."""
+    global intent_router, INTENT_ROUTER_ENABLED
+    if intent_router is not None or not INTENT_ROUTER_ENABLED:
+        return intent_router
+    
+    try:
+        from intent_artifacts import current_artifacts
+        from intent_router import IntentRouter
+        # words, classes and weights of the currently published training run
+        artifacts = current_artifacts()
+        if os.path.exists(artifacts['bundle']):
+            intent_router = IntentRouter.from_bundle(
+                artifacts['bundle'],
+                threshold=INTENT_ROUTER_THRESHOLD,
+                routable_tags=INTENT_ROUTER_TAGS
+            )
+        else:
+            intent_router = IntentRouter.load(
+                words_path=artifacts['words'],
+                classes_path=artifacts['classes'],
+                model_path=artifacts['model_npz'],
+                threshold=INTENT_ROUTER_THRESHOLD,
+                routable_tags=INTENT_ROUTER_TAGS
+            )
+        return intent_router
+    except Exception as e:
+        print(f"Error loading intent router, sending every message to Gemini: {e}")
+        INTENT_ROUTER_ENABLED = False
+        return None
+
+def record_llm_call(seconds):
+    """Let the intent router account for a message that needed Gemini"""
+    if intent_router is not None:
+        intent_router.record_llm_call(seconds)
+
+# Optional cache of Gemini answers, reused for similar questions in the same context
+ANSWER_CACHE_ENABLED = os.environ.get('ANSWER_CACHE_ENABLED', 'False').lower() in ('1', 'true', 'yes')
+ANSWER_CACHE_THRESHOLD = float(os.environ.get('ANSWER_CACHE_THRESHOLD', 0.95))
+ANSWER_CACHE_TTL = int(os.environ.get('ANSWER_CACHE_TTL', 3600))
+ANSWER_CACHE_MAX_ENTRIES = int(os.environ.get('ANSWER_CACHE_MAX_ENTRIES', 5000))
+ANSWER_CACHE_SHARED = os.environ.get('ANSWER_CACHE_SHARED', 'False').lower() in ('1', 'true', 'yes')
+ANSWER_CACHE_CONTEXT_MESSAGES = int(os.environ.get('ANSWER_CACHE_CONTEXT_MESSAGES', 2))
+answer_cache = None
+
+def get_answer_cache():
+    """Lazy-build the answer cache; None when disabled or the vocabulary is missing."""
+    global answer_cache, ANSWER_CACHE_ENABLED
+    if answer_cache is not None or not ANSWER_CACHE_ENABLED:
+        return answer_cache
+    
+    try:
+        from answer_cache import PromptVectorizer, SemanticAnswerCache
+        from intent_artifacts import current_artifacts, load_vocabulary
+        from intent_bundle import load_bundle
+        # Prompts are embedded with the intent model's vocabulary, locally
+        artifacts = current_artifacts()
+        if os.path.exists(artifacts['bundle']):
+            words = load_bundle(artifacts['bundle']).words
+        else:
+            words, _ = load_vocabulary(artifacts)
+        answer_cache = SemanticAnswerCache(
+            PromptVectorizer(words),
+            threshold=ANSWER_CACHE_THRESHOLD,
+            ttl=ANSWER_CACHE_TTL,
+            max_entries=ANSWER_CACHE_MAX_ENTRIES,
+            shared=ANSWER_CACHE_SHARED,
+            context_messages=ANSWER_CACHE_CONTEXT_MESSAGES
+        )
+        return answer_cache
+    except Exception as e:
+        print(f"Error loading answer cache, disabling it: {e}")
+        ANSWER_CACHE_ENABLED = False
+        return None
+
+def cached_answer(user_id, history, user_message):
+    """A previous Gemini answer to a similar question in the same context, or None"""
+    cache = get_answer_cache()
+    if not cache:
+        return None
+    try:
+        with metrics.span('answer_cache.get'):
+            return cache.get(user_id, history, user_message)
+    except Exception as e:
+        print(f"Answer cache error: {e}")
+        return None
+
+def store_answer(user_id, history, user_message, bot_message):
+    cache = get_answer_cache()
+    if not cache:
+        return
+    try:
+        cache.put(user_id, history, user_message, bot_message)
+    except Exception as e:
+        print(f"Answer cache error: {e}")
+
 # Database configuration (use environment variables in production)
 DB_CONFIG = {
     'user': os.environ.get('DB_USER', 'root'),
     'password': os.environ.get('DB_PASSWORD', ''),
     'host': os.environ.get('DB_HOST', 'localhost'),
+    'port': int(os.environ.get('DB_PORT', 3306)),
     'database': os.environ.get('DB_NAME', 'chatbot_db')
 }
 
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 3600))
+db_pool = ConnectionPool(
+    DB_CONFIG,
+    size=int(os.environ.get('DB_POOL_SIZE', 10)),
+    timeout=float(os.environ.get('DB_POOL_TIMEOUT', 5)),
+    recycle=DB_POOL_RECYCLE,
+    ping_interval=int(os.environ.get('DB_POOL_PING_INTERVAL', 30))
+)
+
 def get_db():
-    """Get database connection"""
+    """Borrow a pooled database connection; close() returns it to the pool"""
     try:
-        return mysql.connector.connect(**DB_CONFIG)
+        with metrics.span('db.acquire'):
+            return db_pool.connect()
+    except PoolTimeout as err:
+        print(f"Database pool exhausted: {err}")
+        return None
     except mysql.connector.Error as err:
         print(f"Database error: {err}")
         return None
 
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+# Chat history sent to Gemini is capped by an approximate token budget so the
+# cost of a reply stays flat as a conversation grows
+CHAT_HISTORY_TOKEN_BUDGET = int(os.environ.get('CHAT_HISTORY_TOKEN_BUDGET', 8000))
+CHAT_HISTORY_MAX_MESSAGES = int(os.environ.get('CHAT_HISTORY_MAX_MESSAGES', 100))
 
-def extract_text_from_pdf(filepath):
-    """Extract text from PDF file"""
-    text = ""
-    try:
-        with open(filepath, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-    except Exception as e:
-        print(f"Error reading PDF: {e}")
-    return text
+def estimate_tokens(text):
+    """Rough token estimate (~4 characters per token)"""
+    return len(text) // 4 + 1
 
-def extract_text_from_docx(filepath):
-    """Extract text from DOCX file"""
-    try:
-        doc = docx.Document(filepath)
-        return '\n'.join([para.text for para in doc.paragraphs])
-    except Exception as e:
-        print(f"Error reading DOCX: {e}")
-        return ""
+def build_chat_history(messages, token_budget=CHAT_HISTORY_TOKEN_BUDGET):
+    """Turn stored message rows into a Gemini `history=` payload.
+
+    Rows are expected oldest first. The newest turns are kept until the token
+    budget is spent, consecutive turns from the same sender are merged and the
+    history always starts with a user turn, as the API requires.
+    """
+    history = []
+    used = 0
+    for msg in reversed(messages):
+        cost = estimate_tokens(msg['content'])
+        if used + cost > token_budget:
+            break
+        used += cost
+        role = 'user' if msg['sender'] == 'user' else 'model'
+        if history and history[0]['role'] == role:
+            history[0]['parts'].insert(0, msg['content'])
+        else:
+            history.insert(0, {'role': role, 'parts': [msg['content']]})
+    while history and history[0]['role'] != 'user':
+        history.pop(0)
+    return history
+
+# Analyses are cached in the database by a hash of resume text, job and prompt
+RESUME_CACHE_ENABLED = os.environ.get('RESUME_CACHE_ENABLED', 'True').lower() in ('1', 'true', 'yes')
+resume_cache = ResumeAnalysisCache(
+    get_db,
+    max_entries=int(os.environ.get('RESUME_CACHE_MAX_ENTRIES', 10000)),
+    max_age=int(os.environ.get('RESUME_CACHE_MAX_AGE', 30 * 86400))
+)
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 # ==================== AUTHENTICATION ROUTES ====================
 
@@ -95,6 +319,39 @@ def index():
         return redirect(url_for('chatbot'))
     return render_template("login.html")
 
+# Password hashing runs on a bounded pool so a burst of sign-ins cannot take
+# every core; hashes made with another method or cost are replaced with
+# PASSWORD_HASH_METHOD on the user's next successful login
+password_hasher = PasswordHasher(
+    method=os.environ.get('PASSWORD_HASH_METHOD', 'scrypt'),
+    workers=int(os.environ.get('PASSWORD_HASH_WORKERS', 2)),
+    max_pending=int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 32))
+)
+
+def store_password_hash(user_id, old_hash, new_hash):
+    """Replace a user's password hash, unless it changed in the meantime"""
+    conn = get_db()
+    if not conn:
+        raise RuntimeError("Database connection failed while upgrading a password hash")
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE users SET password_hash = %s WHERE id = %s AND password_hash = %s",
+            (new_hash, user_id, old_hash)
+        )
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+
+def start_user_session(user_id, username):
+    """Log a user in; a server-side session also gets a fresh session id"""
+    session['user_id'] = user_id
+    session['username'] = username
+    regenerate = getattr(app.session_interface, 'regenerate', None)
+    if regenerate:
+        regenerate(session)
+
 @app.route("/register", methods=["POST"])
 def register():
     data = request.get_json()
@@ -109,36 +366,40 @@ def register():
     if not conn:
         return jsonify({"success": False, "message": "Database connection failed"}), 500
     
-    cursor = conn.cursor()
-    
-    # Check if user already exists
-    cursor.execute("SELECT id FROM users WHERE username = %s OR email = %s", (username, email))
-    if cursor.fetchone():
-        cursor.close()
-        conn.close()
-        return jsonify({"success": False, "message": "Username or email already exists"}), 400
-    
-    # Create new user
-    password_hash = generate_password_hash(password)
     try:
-        cursor.execute(
-            "INSERT INTO users (username, email, password_hash) VALUES (%s, %s, %s)",
-            (username, email, password_hash)
-        )
-        conn.commit()
-        user_id = cursor.lastrowid
-        cursor.close()
-        conn.close()
+        cursor = conn.cursor()
         
-        # Auto-login after registration
-        session['user_id'] = user_id
-        session['username'] = username
+        # Check if user already exists
+        cursor.execute("SELECT id FROM users WHERE username = %s OR email = %s", (username, email))
+        if cursor.fetchone():
+            cursor.close()
+            return jsonify({"success": False, "message": "Username or email already exists"}), 400
         
-        return jsonify({"success": True, "message": "Registration successful"})
-    except Exception as e:
-        cursor.close()
+        # Create new user
+        try:
+            with metrics.span('password.hash'):
+                password_hash = password_hasher.hash(password)
+        except PasswordHasherBusy as e:
+            cursor.close()
+            return jsonify({"success": False, "message": str(e)}), 503
+        try:
+            cursor.execute(
+                "INSERT INTO users (username, email, password_hash) VALUES (%s, %s, %s)",
+                (username, email, password_hash)
+            )
+            conn.commit()
+            user_id = cursor.lastrowid
+        except Exception as e:
+            return jsonify({"success": False, "message": str(e)}), 500
+        finally:
+            cursor.close()
+    finally:
         conn.close()
-        return jsonify({"success": False, "message": str(e)}), 500
+    
+    # Auto-login after registration
+    start_user_session(user_id, username)
+    
+    return jsonify({"success": True, "message": "Registration successful"})
 
 @app.route("/login", methods=["POST"])
 def login():
@@ -153,15 +414,28 @@ def login():
     if not conn:
         return jsonify({"success": False, "message": "Database connection failed"}), 500
     
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM users WHERE username = %s OR email = %s", (username, username))
-    user = cursor.fetchone()
-    cursor.close()
-    conn.close()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        with metrics.span('db.user'):
+            cursor.execute("SELECT id, username, password_hash FROM users WHERE username = %s OR email = %s", (username, username))
+            user = cursor.fetchone()
+        cursor.close()
+    finally:
+        conn.close()
+    
+    try:
+        with metrics.span('password.verify'):
+            valid = user is not None and password_hasher.verify(user['password_hash'], password)
+    except PasswordHasherBusy as e:
+        return jsonify({"success": False, "message": str(e)}), 503
     
-    if user and check_password_hash(user['password_hash'], password):
-        session['user_id'] = user['id']
-        session['username'] = user['username']
+    if valid:
+        if password_hasher.needs_rehash(user['password_hash']):
+            password_hasher.rehash_later(
+                password,
+                lambda new_hash: store_password_hash(user['id'], user['password_hash'], new_hash)
+            )
+        start_user_session(user['id'], user['username'])
         return jsonify({"success": True, "message": "Login successful"})
     else:
         return jsonify({"success": False, "message": "Invalid credentials"}), 401
@@ -179,29 +453,145 @@ def chatbot():
         return redirect(url_for('index'))
     return render_template("chatbot.html", username=session['username'])
 
+# Conversation lists and message histories are paginated with keyset cursors
+CONVERSATIONS_PAGE_SIZE = int(os.environ.get('CONVERSATIONS_PAGE_SIZE', 30))
+MESSAGES_PAGE_SIZE = int(os.environ.get('MESSAGES_PAGE_SIZE', 50))
+MAX_PAGE_SIZE = 100
+
+def encode_cursor(created_at, row_id):
+    """Opaque cursor pointing just past a (created_at, id) row"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError as e:
+        raise ValueError("Invalid cursor") from e
+
+def page_size(default, args=None):
+    """Requested page size from ?limit=, clamped to 1..MAX_PAGE_SIZE"""
+    limit = (request.args if args is None else args).get('limit', default, type=int)
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def paginate(rows, limit):
+    """Split a LIMIT limit + 1 result into (page, has_more, next_cursor)"""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id']) if has_more else None
+    return rows, has_more, next_cursor
+
+# Conversations each user is known to own, with their titles, so chat and
+# history requests can skip the ownership query
+conversation_owners = ConversationOwnerCache(
+    ttl=int(os.environ.get('CONVERSATION_CACHE_TTL', 300)),
+    max_entries=int(os.environ.get('CONVERSATION_CACHE_MAX_ENTRIES', 10000))
+)
+
+# Queries shared with the async serving mode (asgi_app.py)
+CONVERSATIONS_SQL = (
+    "SELECT id, title, created_at FROM conversations WHERE user_id = %s ORDER BY created_at DESC, id DESC LIMIT %s"
+)
+CONVERSATIONS_BEFORE_SQL = (
+    "SELECT id, title, created_at FROM conversations WHERE user_id = %s "
+    "AND (created_at < %s OR (created_at = %s AND id < %s)) "
+    "ORDER BY created_at DESC, id DESC LIMIT %s"
+)
+CONVERSATION_SQL = "SELECT * FROM conversations WHERE id = %s AND user_id = %s"
+MESSAGES_SQL = (
+    "SELECT id, sender, content, created_at FROM messages WHERE conversation_id = %s ORDER BY created_at DESC, id DESC LIMIT %s"
+)
+MESSAGES_BEFORE_SQL = (
+    "SELECT id, sender, content, created_at FROM messages WHERE conversation_id = %s "
+    "AND (created_at < %s OR (created_at = %s AND id < %s)) "
+    "ORDER BY created_at DESC, id DESC LIMIT %s"
+)
+CHAT_HISTORY_SQL = (
+    "SELECT sender, content FROM (SELECT id, sender, content, created_at FROM messages "
+    "WHERE conversation_id = %s ORDER BY created_at DESC, id DESC LIMIT %s) m ORDER BY created_at ASC, id ASC"
+)
+CHAT_CONTEXT_SQL = (
+    "SELECT c.title, m.sender, m.content FROM conversations c "
+    "LEFT JOIN (SELECT id, conversation_id, sender, content, created_at FROM messages "
+    "WHERE conversation_id = %s ORDER BY created_at DESC, id DESC LIMIT %s) m ON m.conversation_id = c.id "
+    "WHERE c.id = %s AND c.user_id = %s ORDER BY m.created_at ASC, m.id ASC"
+)
+INSERT_MESSAGES_SQL = "INSERT INTO messages (conversation_id, sender, content) VALUES (%s, %s, %s)"
+# Only the first message names a conversation, even if a cached title is stale
+RENAME_CONVERSATION_SQL = "UPDATE conversations SET title = %s WHERE id = %s AND title = 'New Chat'"
+DELETE_CONVERSATION_SQL = "DELETE FROM conversations WHERE id = %s AND user_id = %s"
+INSERT_RESUMES_SQL = (
+    "INSERT INTO resumes (user_id, filename, original_filename, analysis_result, score, job_description) "
+    "VALUES (%s, %s, %s, %s, %s, %s)"
+)
+RESUME_HISTORY_SQL = (
+    "SELECT id, original_filename, uploaded_at FROM resumes WHERE user_id = %s ORDER BY uploaded_at DESC LIMIT 10"
+)
+
+def conversations_query(user_id, limit, before):
+    """(sql, params) for a page of conversations, newest first"""
+    if before:
+        return CONVERSATIONS_BEFORE_SQL, (user_id, before[0], before[0], before[1], limit + 1)
+    return CONVERSATIONS_SQL, (user_id, limit + 1)
+
+def messages_query(conv_id, limit, before):
+    """(sql, params) for a page of messages, newest first"""
+    if before:
+        return MESSAGES_BEFORE_SQL, (conv_id, before[0], before[0], before[1], limit + 1)
+    return MESSAGES_SQL, (conv_id, limit + 1)
+
+def chat_turn_rows(conversation_id, user_message, bot_message=None):
+    """Message rows for a turn; without a bot_message only the user's is saved"""
+    rows = [(conversation_id, 'user', user_message)]
+    if bot_message is not None:
+        rows.append((conversation_id, 'bot', bot_message))
+    return rows
+
+def conversation_title(user_message):
+    """Title given to a "New Chat" conversation after its first message"""
+    return user_message[:50] + ('...' if len(user_message) > 50 else '')
+
+def resume_rows(user_id, saved_results, job_description):
+    return [
+        (user_id, filename, result['filename'], result['analysis'], result['score'], job_description or "N/A")
+        for filename, result in saved_results
+    ]
+
 @app.route("/get-conversations", methods=["GET"])
 def get_conversations():
     if 'user_id' not in session:
         return jsonify({"success": False, "message": "Not authenticated"}), 401
     
+    limit = page_size(CONVERSATIONS_PAGE_SIZE)
+    before = request.args.get('cursor')
+    try:
+        before = decode_cursor(before) if before else None
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    
     conn = get_db()
     if not conn:
         return jsonify({"success": False, "message": "Database error"}), 500
     
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute(
-        "SELECT id, title, created_at FROM conversations WHERE user_id = %s ORDER BY created_at DESC",
-        (session['user_id'],)
-    )
-    conversations = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        # Newest first, served from the (user_id, created_at, id, title) index
+        with metrics.span('db.conversations'):
+            cursor.execute(*conversations_query(session['user_id'], limit, before))
+            conversations = cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
+    
+    conversations, has_more, next_cursor = paginate(conversations, limit)
     
     # Convert datetime to string
     for conv in conversations:
         conv['created_at'] = conv['created_at'].isoformat()
     
-    return jsonify({"success": True, "conversations": conversations})
+    return jsonify({"success": True, "conversations": conversations, "has_more": has_more, "next_cursor": next_cursor})
 
 @app.route("/new-conversation", methods=["POST"])
 def new_conversation():
@@ -212,20 +602,23 @@ def new_conversation():
     if not conn:
         return jsonify({"success": False, "message": "Database error"}), 500
     
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO conversations (user_id, title) VALUES (%s, %s)",
-        (session['user_id'], 'New Chat')
-    )
-    conn.commit()
-    conversation_id = cursor.lastrowid
-    cursor.close()
-    conn.close()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO conversations (user_id, title) VALUES (%s, %s)",
+            (session['user_id'], 'New Chat')
+        )
+        conn.commit()
+        conversation_id = cursor.lastrowid
+        cursor.close()
+    finally:
+        conn.close()
+    conversation_owners.put(session['user_id'], conversation_id, 'New Chat')
     
     return jsonify({"success": True, "conversation_id": conversation_id})
 
-@app.route("/load-conversation/<int:conv_id>", methods=["GET"])
-def load_conversation(conv_id):
+@app.route("/delete-conversation/<int:conv_id>", methods=["POST"])
+def delete_conversation(conv_id):
     if 'user_id' not in session:
         return jsonify({"success": False, "message": "Not authenticated"}), 401
     
@@ -233,34 +626,189 @@ def load_conversation(conv_id):
     if not conn:
         return jsonify({"success": False, "message": "Database error"}), 500
     
-    cursor = conn.cursor(dictionary=True)
+    # Messages are removed with it (ON DELETE CASCADE)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(DELETE_CONVERSATION_SQL, (conv_id, session['user_id']))
+        deleted = cursor.rowcount
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+    conversation_owners.discard(conv_id)
     
-    # Verify conversation belongs to user
-    cursor.execute(
-        "SELECT * FROM conversations WHERE id = %s AND user_id = %s",
-        (conv_id, session['user_id'])
-    )
-    conversation = cursor.fetchone()
+    if not deleted:
+        return jsonify({"success": False, "message": "Conversation not found"}), 404
+    return jsonify({"success": True})
+
+@app.route("/load-conversation/<int:conv_id>", methods=["GET"])
+def load_conversation(conv_id):
+    if 'user_id' not in session:
+        return jsonify({"success": False, "message": "Not authenticated"}), 401
+    
+    limit = page_size(MESSAGES_PAGE_SIZE)
+    before = request.args.get('cursor')
+    try:
+        before = decode_cursor(before) if before else None
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    
+    conn = get_db()
+    if not conn:
+        return jsonify({"success": False, "message": "Database error"}), 500
     
-    if not conversation:
+    try:
+        cursor = conn.cursor(dictionary=True)
+        
+        # Verify conversation belongs to user, unless that is already known
+        title = conversation_owners.get(session['user_id'], conv_id)
+        if title is None:
+            with metrics.span('db.conversation'):
+                cursor.execute(CONVERSATION_SQL, (conv_id, session['user_id']))
+                conversation = cursor.fetchone()
+            
+            if not conversation:
+                cursor.close()
+                return jsonify({"success": False, "message": "Conversation not found"}), 404
+            title = conversation['title']
+            conversation_owners.put(session['user_id'], conv_id, title)
+        
+        # Get the newest page of messages (older than the cursor, if given)
+        with metrics.span('db.messages'):
+            cursor.execute(*messages_query(conv_id, limit, before))
+            messages = cursor.fetchall()
         cursor.close()
+    finally:
         conn.close()
-        return jsonify({"success": False, "message": "Conversation not found"}), 404
     
-    # Get messages
-    cursor.execute(
-        "SELECT sender, content, created_at FROM messages WHERE conversation_id = %s ORDER BY created_at ASC",
-        (conv_id,)
-    )
-    messages = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    messages, has_more, next_cursor = paginate(messages, limit)
     
-    # Convert datetime to string
+    # Return the page oldest first, converting datetime to string
+    messages.reverse()
     for msg in messages:
         msg['created_at'] = msg['created_at'].isoformat()
+        del msg['id']
     
-    return jsonify({"success": True, "messages": messages, "title": conversation['title']})
+    return jsonify({
+        "success": True,
+        "messages": messages,
+        "title": title,
+        "has_more": has_more,
+        "next_cursor": next_cursor
+    })
+
+def load_chat_context(conversation_id):
+    """Check ownership and load the conversation's title and recent history.
+
+    Ownership and history come back from a single query, or only the history
+    is read when the owner is cached. The database connection is released
+    before returning so it is not held while the model generates. Returns
+    (title, history, None) on success or (None, None, error_response) otherwise.
+    """
+    user_id = session['user_id']
+    title = conversation_owners.get(user_id, conversation_id)
+    conn = get_db()
+    if not conn:
+        return None, None, (jsonify({"success": False, "message": "Database error"}), 500)
+    
+    try:
+        cursor = conn.cursor(dictionary=True)
+        
+        if title is not None:
+            with metrics.span('db.chat_history'):
+                cursor.execute(CHAT_HISTORY_SQL, (conversation_id, CHAT_HISTORY_MAX_MESSAGES))
+                history = cursor.fetchall()
+            cursor.close()
+            return title, history, None
+        
+        # Verify conversation belongs to user and fetch its most recent messages
+        with metrics.span('db.chat_context'):
+            cursor.execute(
+                CHAT_CONTEXT_SQL,
+                (conversation_id, CHAT_HISTORY_MAX_MESSAGES, conversation_id, user_id)
+            )
+            rows = cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
+    
+    if not rows:
+        return None, None, (jsonify({"success": False, "message": "Conversation not found"}), 404)
+    
+    conversation_owners.put(user_id, conversation_id, rows[0]['title'])
+    history = [row for row in rows if row['sender'] is not None]
+    return rows[0]['title'], history, None
+
+GEMINI_NOT_CONFIGURED = "Gemini API not configured. Please set GENAI_API_KEY environment variable. See README.md for setup instructions."
+
+def new_gemini_chat(history, user_message):
+    """A Gemini chat primed with history, or None if Gemini is not configured"""
+    current_model = get_genai_model()
+    if not current_model:
+        return None
+    budget = max(CHAT_HISTORY_TOKEN_BUDGET - estimate_tokens(user_message), 0)
+    return current_model.start_chat(history=build_chat_history(history, budget))
+
+def start_gemini_chat(history, user_message):
+    """Start a Gemini chat primed with history, so the reply needs one model call.
+
+    Returns (chat, None) or (None, error_response) if Gemini is not configured.
+    """
+    chat = new_gemini_chat(history, user_message)
+    if chat is None:
+        return None, (jsonify({"success": False, "message": GEMINI_NOT_CONFIGURED}), 503)
+    return chat, None
+
+def route_locally(user_message):
+    """Canned intents.json reply for trivial messages when the router is enabled"""
+    router = get_intent_router()
+    if not router:
+        return None
+    try:
+        with metrics.span('intent.route'):
+            return router.route(user_message)
+    except Exception as e:
+        print(f"Intent router error: {e}")
+        return None
+
+def save_chat_turn(conversation_id, title, user_message, bot_message=None):
+    """Persist a chat turn in one transaction.
+
+    The user message and bot reply go in a single multi-row INSERT, and a
+    "New Chat" conversation is renamed after the first message. Without a
+    bot_message only the user's message is saved (e.g. when the model failed).
+    """
+    conn = get_db()
+    if not conn:
+        raise RuntimeError("Database connection failed while saving the conversation")
+    try:
+        cursor = conn.cursor()
+        with metrics.span('db.save_turn'):
+            cursor.executemany(INSERT_MESSAGES_SQL, chat_turn_rows(conversation_id, user_message, bot_message))
+            
+            # Update conversation title if it's "New Chat"
+            if title == 'New Chat':
+                cursor.execute(RENAME_CONVERSATION_SQL, (conversation_title(user_message), conversation_id))
+            
+            conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+    if title == 'New Chat':
+        # the next request reads the new title
+        conversation_owners.discard(conversation_id)
+
+def save_failed_chat_turn(conversation_id, title, user_message):
+    """Keep the user's message even though no reply was produced"""
+    try:
+        save_chat_turn(conversation_id, title, user_message)
+    except Exception as e:
+        print(f"Error saving message: {e}")
+
+def sse_event(payload):
+    """Format a JSON payload as a Server-Sent Event"""
+    with metrics.span('json.encode'):
+        return f"data: {json.dumps(payload)}\n\n"
 
 @app.route("/send-message", methods=["POST"])
 def send_message():
@@ -274,83 +822,159 @@ def send_message():
     if not conversation_id or not user_message:
         return jsonify({"success": False, "message": "Missing data"}), 400
     
-    conn = get_db()
-    if not conn:
-        return jsonify({"success": False, "message": "Database error"}), 500
-    
-    cursor = conn.cursor(dictionary=True)
+    try:
+        title, history, error = load_chat_context(conversation_id)
+        if error:
+            return error
+        
+        # Trivial messages (greetings, thanks, ...) and repeated questions can
+        # skip Gemini entirely
+        bot_message = route_locally(user_message)
+        if bot_message is None:
+            bot_message = cached_answer(session['user_id'], history, user_message)
+        if bot_message is not None:
+            save_chat_turn(conversation_id, title, user_message, bot_message)
+            return jsonify({"success": True, "response": bot_message})
+        
+        chat, error = start_gemini_chat(history, user_message)
+    except Exception as e:
+        return jsonify({"success": False, "message": f"AI Error: {str(e)}"}), 500
+    if error:
+        return error
     
-    # Verify conversation belongs to user
-    cursor.execute(
-        "SELECT * FROM conversations WHERE id = %s AND user_id = %s",
-        (conversation_id, session['user_id'])
-    )
-    conversation = cursor.fetchone()
+    # Get AI response
+    try:
+        start = time.perf_counter()
+        with metrics.span('gemini.chat'):
+            response = chat.send_message(user_message)
+            bot_message = response.text
+        record_llm_call(time.perf_counter() - start)
+        metrics.record_gemini_usage(response)
+    except GeminiUnavailable as e:
+        save_failed_chat_turn(conversation_id, title, user_message)
+        return jsonify({"success": False, "message": str(e)}), 503
+    except Exception as e:
+        save_failed_chat_turn(conversation_id, title, user_message)
+        return jsonify({"success": False, "message": f"AI Error: {str(e)}"}), 500
+    store_answer(session['user_id'], history, user_message, bot_message)
     
-    if not conversation:
-        cursor.close()
-        conn.close()
-        return jsonify({"success": False, "message": "Conversation not found"}), 404
+    # Save both messages
+    try:
+        save_chat_turn(conversation_id, title, user_message, bot_message)
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Database error: {str(e)}"}), 500
     
-    # Save user message
-    cursor.execute(
-        "INSERT INTO messages (conversation_id, sender, content) VALUES (%s, %s, %s)",
-        (conversation_id, 'user', user_message)
-    )
+    return jsonify({"success": True, "response": bot_message})
+
+@app.route("/send-message-stream", methods=["POST"])
+def send_message_stream():
+    """Like /send-message, but streams the reply as Server-Sent Events.
+
+    Each event carries {"delta": text} as Gemini produces it, followed by
+    {"done": true} once the turn is saved, or {"error": message}.
+    """
+    if 'user_id' not in session:
+        return jsonify({"success": False, "message": "Not authenticated"}), 401
     
-    # Update conversation title if it's "New Chat"
-    if conversation['title'] == 'New Chat':
-        title = user_message[:50] + ('...' if len(user_message) > 50 else '')
-        cursor.execute(
-            "UPDATE conversations SET title = %s WHERE id = %s",
-            (title, conversation_id)
-        )
+    data = request.get_json()
+    conversation_id = data.get('conversation_id')
+    user_message = data.get('message')
     
-    conn.commit()
+    if not conversation_id or not user_message:
+        return jsonify({"success": False, "message": "Missing data"}), 400
     
-    # Get AI response
     try:
-        # Check if Gemini API is configured
-        current_model = get_genai_model()
-        if not current_model:
-            cursor.close()
-            conn.close()
-            return jsonify({
-                "success": False, 
-                "message": "Gemini API not configured. Please set GENAI_API_KEY environment variable. See README.md for setup instructions."
-            }), 503
+        title, history, error = load_chat_context(conversation_id)
+        if error:
+            return error
         
-        # Get conversation history for context
-        cursor.execute(
-            "SELECT sender, content FROM messages WHERE conversation_id = %s ORDER BY created_at ASC",
-            (conversation_id,)
-        )
-        history = cursor.fetchall()
-        
-        # Build chat with history
-        chat = current_model.start_chat(history=[])
-        for msg in history[:-1]:  # Exclude the message we just added
-            if msg['sender'] == 'user':
-                chat.send_message(msg['content'])
-        
-        response = chat.send_message(user_message)
-        bot_message = response.text
-        
-        # Save bot response
-        cursor.execute(
-            "INSERT INTO messages (conversation_id, sender, content) VALUES (%s, %s, %s)",
-            (conversation_id, 'bot', bot_message)
-        )
-        conn.commit()
-        
-        cursor.close()
-        conn.close()
-        
-        return jsonify({"success": True, "response": bot_message})
+        user_id = session['user_id']
+        local_reply = route_locally(user_message)
+        if local_reply is None:
+            local_reply = cached_answer(user_id, history, user_message)
+        chat = None
+        if local_reply is None:
+            chat, error = start_gemini_chat(history, user_message)
     except Exception as e:
-        cursor.close()
-        conn.close()
         return jsonify({"success": False, "message": f"AI Error: {str(e)}"}), 500
+    if error:
+        return error
+    
+    # Open the Gemini stream before responding, so a shed request (circuit
+    # open, no capacity) gets a 503 instead of an event stream
+    stream = None
+    if local_reply is None:
+        start = time.perf_counter()
+        try:
+            stream = chat.send_message(user_message, stream=True)
+        except GeminiUnavailable as e:
+            save_failed_chat_turn(conversation_id, title, user_message)
+            return jsonify({"success": False, "message": str(e)}), 503
+        except Exception as e:
+            save_failed_chat_turn(conversation_id, title, user_message)
+            return jsonify({"success": False, "message": f"AI Error: {str(e)}"}), 500
+    
+    parts = []
+    saved = False
+    
+    def save_turn():
+        """Save the turn once, with whatever part of the reply was produced"""
+        nonlocal saved
+        if saved:
+            return
+        saved = True
+        save_chat_turn(conversation_id, title, user_message, ''.join(parts) or None)
+    
+    def save_interrupted_turn():
+        # the model failed, or the client went away mid-stream or before it
+        # started; there is nobody left to report a database error to
+        try:
+            save_turn()
+        except Exception as e:
+            print(f"Error saving message: {e}")
+    
+    def generate():
+        try:
+            try:
+                if local_reply is not None:
+                    parts.append(local_reply)
+                    yield sse_event({"delta": local_reply})
+                else:
+                    chunk = None
+                    for chunk in stream:
+                        text = chunk.text
+                        if text:
+                            parts.append(text)
+                            yield sse_event({"delta": text})
+                    record_llm_call(time.perf_counter() - start)
+                    # includes the time the client took to read the stream
+                    metrics.record_span('gemini.stream', time.perf_counter() - start)
+                    # the final chunk carries the usage of the whole reply
+                    metrics.record_gemini_usage(chunk)
+                    store_answer(user_id, history, user_message, ''.join(parts))
+            except Exception as e:
+                save_interrupted_turn()
+                yield sse_event({"error": f"AI Error: {str(e)}"})
+                return
+            
+            # Save the turn in a single write once the reply is complete
+            try:
+                save_turn()
+            except Exception as e:
+                yield sse_event({"error": f"Database error: {str(e)}"})
+                return
+            yield sse_event({"done": True})
+        finally:
+            # GeneratorExit when the client disconnects mid-stream
+            save_interrupted_turn()
+    
+    response = Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    response.call_on_close(save_interrupted_turn)
+    return response
 
 # ==================== RESUME ANALYZER ROUTES ====================
 
@@ -360,64 +984,14 @@ def resume_analyzer():
         return redirect(url_for('index'))
     return render_template("resume_analyzer.html", username=session['username'])
 
-@app.route("/upload-resume", methods=["POST"])
-def upload_resume():
-    if 'user_id' not in session:
-        return jsonify({"success": False, "message": "Not authenticated"}), 401
-    
-    job_description = request.form.get('job_description', '')
-    
-    if 'resumes' not in request.files:
-        return jsonify({"success": False, "message": "No files uploaded"}), 400
-    
-    files = request.files.getlist('resumes')
-    
-    if len(files) == 0:
-        return jsonify({"success": False, "message": "No files selected"}), 400
-    
-    results = []
-    
-    for file in files:
-        if file.filename == '':
-            continue
-            
-        if not allowed_file(file.filename):
-            continue
-        
-        # Save file
-        original_filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{session['user_id']}_{timestamp}_{original_filename}"
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        
-        # Extract text
-        if original_filename.endswith('.pdf'):
-            resume_text = extract_text_from_pdf(filepath)
-        else:
-            resume_text = extract_text_from_docx(filepath)
-        
-        if not resume_text.strip():
-            results.append({
-                "filename": original_filename,
-                "error": "Could not extract text from resume"
-            })
-            continue
-        
-        # Analyze with AI
-        try:
-            # Check if Gemini API is configured
-            current_model = get_genai_model()
-            if not current_model:
-                results.append({
-                    "filename": original_filename,
-                    "error": "Gemini API not configured. Please set GENAI_API_KEY environment variable."
-                })
-                continue
-            
-            if job_description:
-                # Score resume against job description
-                prompt = f"""Analyze this resume against the job description and provide:
+# Bump whenever build_resume_prompt changes so cached analyses are not reused
+RESUME_PROMPT_VERSION = 'resume-v1'
+
+def build_resume_prompt(resume_text, job_description):
+    """Build the Gemini prompt for a resume, scored against the job if given"""
+    if job_description:
+        # Score resume against job description
+        return f"""Analyze this resume against the job description and provide:
 1. **Match Score** (0-100): How well the candidate matches the job
 2. **Key Matching Skills**: Skills that align with the job
 3. **Missing Skills**: Required skills not present
@@ -432,9 +1006,8 @@ Resume:
 {resume_text}
 
 Format your response in clear sections."""
-            else:
-                # General resume analysis
-                prompt = f"""Analyze this resume and provide:
+    # General resume analysis
+    return f"""Analyze this resume and provide:
 1. **Overall Score** (out of 100)
 2. **Key Skills Identified** (bullet list)
 3. **Experience Summary**
@@ -448,36 +1021,190 @@ Resume Text:
 
 Format your response in clear sections."""
 
-            response = current_model.generate_content(prompt)
+def extract_score(analysis):
+    """Extract score from analysis (look for number out of 100)"""
+    score_match = re.search(r'(\d{1,3})(?:/100|%|\s*out of 100)', analysis, re.IGNORECASE)
+    return float(score_match.group(1)) if score_match else 50.0
+
+def analyze_resume(source, original_filename, job_description):
+    """Extract a resume's text (from a path or stream) and analyze it with Gemini.
+
+    Runs on the resume worker pool, so it must not touch the request context.
+    Returns a result dict with either score/analysis or an error.
+    """
+    # Extract text
+    if original_filename.endswith('.pdf'):
+        with metrics.span('extract.pdf'):
+            resume_text = extract_text_from_pdf(source)
+    else:
+        with metrics.span('extract.docx'):
+            resume_text = extract_text_from_docx(source)
+    
+    if not resume_text.strip():
+        return {
+            "filename": original_filename,
+            "error": "Could not extract text from resume"
+        }
+    
+    # Reuse a stored analysis of the same text, job and prompt
+    key = cache_key(resume_text, job_description, RESUME_PROMPT_VERSION)
+    cached = resume_cache.get(key) if RESUME_CACHE_ENABLED else None
+    if cached:
+        analysis, score = cached
+        return {
+            "filename": original_filename,
+            "score": score,
+            "analysis": analysis
+        }
+    
+    # Analyze with AI
+    try:
+        # Check if Gemini API is configured
+        current_model = get_genai_model()
+        if not current_model:
+            return {
+                "filename": original_filename,
+                "error": "Gemini API not configured. Please set GENAI_API_KEY environment variable."
+            }
+        
+        with metrics.span('gemini.resume'):
+            response = current_model.generate_content(
+                build_resume_prompt(resume_text, job_description),
+                timeout=RESUME_ANALYSIS_TIMEOUT
+            )
             analysis = response.text
+        metrics.record_gemini_usage(response)
+        score = extract_score(analysis)
+        
+        if RESUME_CACHE_ENABLED:
+            resume_cache.put(key, analysis, score)
+        
+        return {
+            "filename": original_filename,
+            "score": score,
+            "analysis": analysis
+        }
+    except Exception as e:
+        return {
+            "filename": original_filename,
+            "error": f"Analysis error: {str(e)}"
+        }
+
+def retain_upload(filename, content):
+    """Keep a copy of an upload in UPLOAD_FOLDER if retention is enabled"""
+    if not UPLOAD_RETENTION_ENABLED:
+        return
+    try:
+        with open(os.path.join(app.config['UPLOAD_FOLDER'], filename), 'wb') as file:
+            file.write(content)
+    except OSError as e:
+        print(f"Error retaining upload {filename}: {e}")
+
+def save_resume_results(user_id, saved_results, job_description):
+    """Insert analyzed resumes with a single multi-row write.
+
+    `saved_results` is a list of (stored filename, result dict) pairs.
+    """
+    rows = resume_rows(user_id, saved_results, job_description)
+    if not rows:
+        return
+    conn = get_db()
+    if not conn:
+        return
+    try:
+        cursor = conn.cursor()
+        # executemany() folds INSERT ... VALUES into one multi-row statement
+        with metrics.span('db.save_resumes'):
+            cursor.executemany(INSERT_RESUMES_SQL, rows)
+            conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+
+@app.route("/upload-resume", methods=["POST"])
+def upload_resume():
+    if 'user_id' not in session:
+        return jsonify({"success": False, "message": "Not authenticated"}), 401
+    
+    job_description = request.form.get('job_description', '')
+    
+    if 'resumes' not in request.files:
+        return jsonify({"success": False, "message": "No files uploaded"}), 400
+    
+    files = request.files.getlist('resumes')
+    
+    if len(files) == 0:
+        return jsonify({"success": False, "message": "No files selected"}), 400
+    
+    user_id = session['user_id']
+    
+    # Large batches can be queued and polled via /resume-jobs/<job_id>
+    if request.form.get('async', '').lower() in ('1', 'true', 'yes'):
+        queued = []
+        for file in files:
+            if file.filename == '' or not allowed_file(file.filename):
+                continue
+            original_filename = secure_filename(file.filename)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"{user_id}_{timestamp}_{original_filename}"
+            content = file.read()
+            retain_upload(filename, content)
+            queued.append((filename, original_filename, content))
+        
+        if not queued:
+            return jsonify({"success": False, "message": "No valid files selected"}), 400
+        
+        job_id = resume_jobs.submit(user_id, job_description, queued)
+        return jsonify({
+            "success": True,
+            "job_id": job_id,
+            "status_url": url_for('resume_job_status', job_id=job_id)
+        }), 202
+    
+    futures = []
+    
+    for file in files:
+        if file.filename == '':
+            continue
             
-            # Extract score from analysis (look for number out of 100)
-            import re
-            score_match = re.search(r'(\d{1,3})(?:/100|%|\s*out of 100)', analysis, re.IGNORECASE)
-            score = float(score_match.group(1)) if score_match else 50.0
-            
-            # Save to database
-            conn = get_db()
-            if conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "INSERT INTO resumes (user_id, filename, original_filename, analysis_result, score, job_description) VALUES (%s, %s, %s, %s, %s, %s)",
-                    (session['user_id'], filename, original_filename, analysis, score, job_description or "N/A")
-                )
-                conn.commit()
-                cursor.close()
-                conn.close()
-            
-            results.append({
-                "filename": original_filename,
-                "score": score,
-                "analysis": analysis
-            })
-        except Exception as e:
+        if not allowed_file(file.filename):
+            continue
+        
+        original_filename = secure_filename(file.filename)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"{user_id}_{timestamp}_{original_filename}"
+        content = file.read()
+        retain_upload(filename, content)
+        
+        # Extraction and analysis run concurrently on the resume worker pool,
+        # parsing the upload straight from memory; the copied context lets
+        # their spans count towards this request
+        future = resume_executor.submit(
+            contextvars.copy_context().run, analyze_resume, io.BytesIO(content), original_filename, job_description
+        )
+        futures.append((filename, original_filename, future))
+    
+    # Give the whole batch as long as it takes the pool to work through it
+    batches = -(-len(futures) // RESUME_ANALYSIS_WORKERS)
+    wait([f for _, _, f in futures], timeout=RESUME_ANALYSIS_TIMEOUT * max(batches, 1) + 10)
+    
+    results = []
+    saved_results = []
+    for filename, original_filename, future in futures:
+        if not future.done():
+            future.cancel()
             results.append({
                 "filename": original_filename,
-                "error": f"Analysis error: {str(e)}"
+                "error": "Analysis error: timed out"
             })
+            continue
+        result = future.result()
+        if 'score' in result:
+            saved_results.append((filename, result))
+        results.append(result)
+    
+    # Save to database
+    save_resume_results(user_id, saved_results, job_description)
     
     # Sort by score (highest first)
     results_sorted = sorted([r for r in results if 'score' in r], key=lambda x: x['score'], reverse=True)
@@ -489,6 +1216,58 @@ Format your response in clear sections."""
         "errors": errors
     })
 
+def process_resume_job_file(file, job):
+    """Analyze one file of a queued resume job"""
+    return analyze_resume(io.BytesIO(file['content']), file['original_filename'], job['job_description'])
+
+def complete_resume_job(job, files):
+    """Save a finished job's successful analyses to `resumes`"""
+    saved_results = [(f['filename'], f['result']) for f in files if 'score' in f['result']]
+    save_resume_results(job['user_id'], saved_results, job['job_description'])
+
+resume_jobs = ResumeJobQueue(
+    os.environ.get('RESUME_JOBS_DB', 'resume_jobs.sqlite3'),
+    process_resume_job_file,
+    on_job_complete=complete_resume_job,
+    workers=int(os.environ.get('RESUME_JOB_WORKERS', 2)),
+    lease=int(os.environ.get('RESUME_JOB_LEASE_SECONDS', 60))
+)
+
+def start_background_workers():
+    """Start the PDF extraction processes, the resume job workers and the
+    upload sweeper in this process"""
+    # fork the PDF workers before this process starts any thread of its own
+    start_pdf_workers()
+    if upload_sweeper is not None:
+        upload_sweeper.start()
+    resume_jobs.start()
+
+# A pre-forking server (serve.py) imports the app once in its master process
+# and starts the background threads in each worker instead
+if os.environ.get('DEFER_BACKGROUND_WORKERS', 'False').lower() not in ('1', 'true', 'yes'):
+    start_background_workers()
+
+# Load the intent model and warm up NLTK now rather than on the first chat message
+get_intent_router()
+
+@app.route("/resume-jobs/<job_id>", methods=["GET"])
+def resume_job_status(job_id):
+    if 'user_id' not in session:
+        return jsonify({"success": False, "message": "Not authenticated"}), 401
+    
+    job = resume_jobs.get_job(job_id, session['user_id'])
+    if not job:
+        return jsonify({"success": False, "message": "Job not found"}), 404
+    
+    # Partial results, score-sorted like /upload-resume
+    results = [f['result'] for f in job['files'] if f['result']]
+    job['results'] = sorted([r for r in results if 'score' in r], key=lambda x: x['score'], reverse=True)
+    job['errors'] = [r for r in results if 'error' in r]
+    for f in job['files']:
+        del f['result']
+    
+    return jsonify({"success": True, **job})
+
 @app.route("/download-csv", methods=["POST"])
 def download_csv():
     if 'user_id' not in session:
@@ -539,20 +1318,141 @@ def get_resume_history():
     if not conn:
         return jsonify({"success": False, "message": "Database error"}), 500
     
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute(
-        "SELECT id, original_filename, uploaded_at FROM resumes WHERE user_id = %s ORDER BY uploaded_at DESC LIMIT 10",
-        (session['user_id'],)
-    )
-    resumes = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        with metrics.span('db.resume_history'):
+            cursor.execute(RESUME_HISTORY_SQL, (session['user_id'],))
+            resumes = cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
     
     for resume in resumes:
         resume['uploaded_at'] = resume['uploaded_at'].isoformat()
     
     return jsonify({"success": True, "resumes": resumes})
 
+# ==================== OPERATIONS ROUTES ====================
+
+# Requests being handled by this process, and whether it is shutting down
+in_flight_lock = threading.Lock()
+in_flight_requests = 0
+draining = False
+
+# Requests taking at least this many seconds are logged with their span
+# breakdown (see metrics.py); 0 disables the log
+SLOW_REQUEST_SECONDS = float(os.environ.get('SLOW_REQUEST_SECONDS', 0))
+
+def route_label():
+    """The matched URL rule, so ids in paths do not create new series"""
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+def enter_request():
+    """Count a request as in flight; also used by the async routes in asgi_app.py"""
+    global in_flight_requests
+    with in_flight_lock:
+        in_flight_requests += 1
+
+def leave_request():
+    global in_flight_requests
+    with in_flight_lock:
+        in_flight_requests -= 1
+
+@app.before_request
+def start_request():
+    enter_request()
+    g.request_timings = metrics.begin_request(route_label(), request.method)
+
+@app.after_request
+def finish_request_on_close(response):
+    # Runs once the response, including a streamed body, has been sent.
+    # (teardown_request runs twice for stream_with_context responses.)
+    timings = g.request_timings
+    status = response.status_code
+    
+    def finish():
+        leave_request()
+        metrics.end_request(timings, status, SLOW_REQUEST_SECONDS)
+    
+    response.call_on_close(finish)
+    return response
+
+def start_draining():
+    """Report not ready and stop taking resume jobs; in-flight requests finish"""
+    global draining
+    draining = True
+    resume_jobs.stop(timeout=0)
+    print(f"Draining with {in_flight_requests} request(s) in flight")
+
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    """Liveness: the process is up and serving requests"""
+    return jsonify({"status": "ok"})
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    """Readiness: a database connection can be borrowed, Gemini is configured
+    and the process is not draining.
+
+    Never calls the model. The circuit breaker state and the intent router
+    are reported but do not fail the check: an open circuit is shared by
+    every instance, and without the router messages go to Gemini.
+    """
+    checks = {}
+    conn = get_db()
+    try:
+        if conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+        checks['database'] = conn is not None
+    except mysql.connector.Error:
+        checks['database'] = False
+    finally:
+        if conn:
+            conn.close()
+    
+    current_model = get_genai_model()
+    checks['gemini'] = current_model is not None
+    checks['gemini_circuit'] = current_model.breaker.state if current_model else None
+    checks['intent_router'] = intent_router is not None if INTENT_ROUTER_ENABLED else 'disabled'
+    
+    ready = checks['database'] and checks['gemini'] and not draining
+    return jsonify({
+        "ready": ready,
+        "draining": draining,
+        "in_flight_requests": in_flight_requests,
+        "checks": checks
+    }), 200 if ready else 503
+
+# /stats counters are exported on /metrics as gauges as well
+metrics.register_stats('chatbot_db_pool', db_pool.stats)
+metrics.register_stats('chatbot_resume_cache', resume_cache.stats)
+metrics.register_stats('chatbot_conversation_cache', conversation_owners.stats)
+metrics.register_stats('chatbot_passwords', password_hasher.stats)
+metrics.register_stats('chatbot_intent_router', lambda: intent_router.stats() if intent_router else None)
+metrics.register_stats('chatbot_answer_cache', lambda: answer_cache.stats() if answer_cache else None)
+metrics.register_stats('chatbot_gemini', lambda: model.stats() if model else None)
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Latency histograms, span timings and token counts for Prometheus"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route("/stats", methods=["GET"])
+def stats():
+    return jsonify({
+        "success": True,
+        "db_pool": db_pool.stats(),
+        "resume_cache": resume_cache.stats(),
+        "conversation_cache": conversation_owners.stats(),
+        "passwords": password_hasher.stats(),
+        "intent_router": intent_router.stats() if intent_router else None,
+        "answer_cache": answer_cache.stats() if answer_cache else None,
+        "gemini": model.stats() if model else None
+    })
+
 if __name__ == "__main__":
     host = os.environ.get('HOST', '0.0.0.0')
     port = int(os.environ.get('PORT', 5000))
@@ -0,0 +1,594 @@
+"""Async (ASGI) serving mode.
+
+The chat, resume upload and read endpoints are served by Quart, awaiting
+MySQL through aiomysql and Gemini through its async API, so a single
+process can hold many in-flight LLM waits without a thread each. Every
+other path is passed to the Flask app in app.py unchanged. Routes, JSON
+responses and the login session cookie are the same in both modes.
+
+Run with:
+
+    hypercorn asgi_app:application --bind 0.0.0.0:5000
+"""
+import asyncio
+import io
+import os
+import time
+from datetime import datetime
+
+import aiomysql
+from asgiref.wsgi import WsgiToAsgi
+from quart import Quart, Response, jsonify, request
+from quart.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import MethodNotAllowed, NotFound
+from werkzeug.utils import secure_filename
+from werkzeug.wrappers import Request as WerkzeugRequest
+
+import app as flask_module
+import metrics
+from app import (
+    CHAT_CONTEXT_SQL, CHAT_HISTORY_MAX_MESSAGES, CHAT_HISTORY_SQL, CONVERSATION_SQL, CONVERSATIONS_PAGE_SIZE, GEMINI_NOT_CONFIGURED,
+    INSERT_MESSAGES_SQL, INSERT_RESUMES_SQL, MESSAGES_PAGE_SIZE, RENAME_CONVERSATION_SQL, RESUME_ANALYSIS_TIMEOUT,
+    RESUME_ANALYSIS_WORKERS, RESUME_HISTORY_SQL, RESUME_PROMPT_VERSION, allowed_file, build_resume_prompt,
+    cached_answer, chat_turn_rows, conversation_title, conversations_query, decode_cursor, extract_score,
+    messages_query, new_gemini_chat, page_size, paginate, record_llm_call, resume_rows, retain_upload,
+    route_locally, sse_event, store_answer,
+)
+from gemini_client import GeminiUnavailable
+from resume_cache import cache_key
+from text_extraction import extract_text_from_docx, extract_text_from_pdf
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Records jsonify() encoding as the json.encode span, as in app.py"""
+
+    def response(self, *args, **kwargs):
+        with metrics.span('json.encode'):
+            return super().response(*args, **kwargs)
+
+flask_app = flask_module.app
+async_app = Quart(__name__, static_folder=None)
+async_app.json = TimedJSONProvider(async_app)
+
+ASYNC_DB_POOL_SIZE = int(os.environ.get('ASYNC_DB_POOL_SIZE', 20))
+db_pool = None
+
+@async_app.before_serving
+async def open_db_pool():
+    global db_pool
+    config = flask_module.DB_CONFIG
+    db_pool = await aiomysql.create_pool(
+        host=config['host'],
+        port=config['port'],
+        user=config['user'],
+        password=config['password'],
+        db=config['database'],
+        minsize=0,
+        maxsize=ASYNC_DB_POOL_SIZE,
+        pool_recycle=flask_module.DB_POOL_RECYCLE,
+        # reads must not keep a snapshot open on pooled connections
+        autocommit=True
+    )
+
+@async_app.after_serving
+async def close_db_pool():
+    if db_pool is not None:
+        db_pool.close()
+        await db_pool.wait_closed()
+
+async def fetch_all(query, params):
+    async with db_pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(query, params)
+            return await cursor.fetchall()
+
+async def fetch_one(query, params):
+    rows = await fetch_all(query, params)
+    return rows[0] if rows else None
+
+async def write_many(statements):
+    """Run (query, rows) executemany statements in one transaction"""
+    async with db_pool.acquire() as conn:
+        await conn.begin()
+        try:
+            async with conn.cursor() as cursor:
+                for query, rows in statements:
+                    await cursor.executemany(query, rows)
+            await conn.commit()
+        except BaseException:
+            await conn.rollback()
+            raise
+
+async def session_user_id():
+    """The logged-in user, read through the Flask app's session interface"""
+    cookies = WerkzeugRequest({'HTTP_COOKIE': request.headers.get('Cookie', '')})
+    if flask_module.SESSION_BACKEND == 'cookie':
+        session = flask_app.session_interface.open_session(flask_app, cookies)
+    else:
+        # server-side sessions are read from disk or Redis
+        session = await asyncio.to_thread(flask_app.session_interface.open_session, flask_app, cookies)
+    return session.get('user_id') if session else None
+
+def not_authenticated():
+    return jsonify({"success": False, "message": "Not authenticated"}), 401
+
+def database_error():
+    return jsonify({"success": False, "message": "Database error"}), 500
+
+# ==================== CHATBOT ROUTES ====================
+
+@async_app.route("/get-conversations", methods=["GET"])
+async def get_conversations():
+    user_id = await session_user_id()
+    if user_id is None:
+        return not_authenticated()
+
+    limit = page_size(CONVERSATIONS_PAGE_SIZE, request.args)
+    before = request.args.get('cursor')
+    try:
+        before = decode_cursor(before) if before else None
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    try:
+        with metrics.span('db.conversations'):
+            conversations = await fetch_all(*conversations_query(user_id, limit, before))
+    except Exception as e:
+        print(f"Database error: {e}")
+        return database_error()
+
+    conversations, has_more, next_cursor = paginate(conversations, limit)
+    for conv in conversations:
+        conv['created_at'] = conv['created_at'].isoformat()
+
+    return jsonify({"success": True, "conversations": conversations, "has_more": has_more, "next_cursor": next_cursor})
+
+@async_app.route("/load-conversation/<int:conv_id>", methods=["GET"])
+async def load_conversation(conv_id):
+    user_id = await session_user_id()
+    if user_id is None:
+        return not_authenticated()
+
+    limit = page_size(MESSAGES_PAGE_SIZE, request.args)
+    before = request.args.get('cursor')
+    try:
+        before = decode_cursor(before) if before else None
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    try:
+        title = flask_module.conversation_owners.get(user_id, conv_id)
+        if title is None:
+            with metrics.span('db.conversation'):
+                conversation = await fetch_one(CONVERSATION_SQL, (conv_id, user_id))
+            if not conversation:
+                return jsonify({"success": False, "message": "Conversation not found"}), 404
+            title = conversation['title']
+            flask_module.conversation_owners.put(user_id, conv_id, title)
+        with metrics.span('db.messages'):
+            messages = await fetch_all(*messages_query(conv_id, limit, before))
+    except Exception as e:
+        print(f"Database error: {e}")
+        return database_error()
+
+    messages, has_more, next_cursor = paginate(messages, limit)
+    messages.reverse()
+    for msg in messages:
+        msg['created_at'] = msg['created_at'].isoformat()
+        del msg['id']
+
+    return jsonify({
+        "success": True,
+        "messages": messages,
+        "title": title,
+        "has_more": has_more,
+        "next_cursor": next_cursor
+    })
+
+async def load_chat_context(conversation_id, user_id):
+    """(title, history) of a conversation the user owns, or None"""
+    title = flask_module.conversation_owners.get(user_id, conversation_id)
+    if title is not None:
+        with metrics.span('db.chat_history'):
+            return title, list(await fetch_all(CHAT_HISTORY_SQL, (conversation_id, CHAT_HISTORY_MAX_MESSAGES)))
+    with metrics.span('db.chat_context'):
+        rows = await fetch_all(CHAT_CONTEXT_SQL, (conversation_id, CHAT_HISTORY_MAX_MESSAGES, conversation_id, user_id))
+    if not rows:
+        return None
+    flask_module.conversation_owners.put(user_id, conversation_id, rows[0]['title'])
+    return rows[0]['title'], [row for row in rows if row['sender'] is not None]
+
+async def save_chat_turn(conversation_id, title, user_message, bot_message=None):
+    statements = [(INSERT_MESSAGES_SQL, chat_turn_rows(conversation_id, user_message, bot_message))]
+    if title == 'New Chat':
+        statements.append((RENAME_CONVERSATION_SQL, [(conversation_title(user_message), conversation_id)]))
+    with metrics.span('db.save_turn'):
+        await write_many(statements)
+    if title == 'New Chat':
+        flask_module.conversation_owners.discard(conversation_id)
+
+async def save_failed_chat_turn(conversation_id, title, user_message):
+    try:
+        await save_chat_turn(conversation_id, title, user_message)
+    except Exception as e:
+        print(f"Error saving message: {e}")
+
+async def chat_request():
+    """Validate a chat request: (user_id, conversation_id, message, title, history) or an error response"""
+    user_id = await session_user_id()
+    if user_id is None:
+        return None, not_authenticated()
+
+    data = await request.get_json()
+    conversation_id = data.get('conversation_id')
+    user_message = data.get('message')
+    if not conversation_id or not user_message:
+        return None, (jsonify({"success": False, "message": "Missing data"}), 400)
+
+    try:
+        context = await load_chat_context(conversation_id, user_id)
+    except Exception as e:
+        print(f"Database error: {e}")
+        return None, database_error()
+    if context is None:
+        return None, (jsonify({"success": False, "message": "Conversation not found"}), 404)
+    return (user_id, conversation_id, user_message) + context, None
+
+@async_app.route("/send-message", methods=["POST"])
+async def send_message():
+    chat_context, error = await chat_request()
+    if error:
+        return error
+    user_id, conversation_id, user_message, title, history = chat_context
+
+    try:
+        # Trivial messages (greetings, thanks, ...) and repeated questions can
+        # skip Gemini entirely
+        bot_message = route_locally(user_message)
+        if bot_message is None:
+            bot_message = cached_answer(user_id, history, user_message)
+        if bot_message is not None:
+            await save_chat_turn(conversation_id, title, user_message, bot_message)
+            return jsonify({"success": True, "response": bot_message})
+
+        chat = new_gemini_chat(history, user_message)
+    except Exception as e:
+        return jsonify({"success": False, "message": f"AI Error: {str(e)}"}), 500
+    if chat is None:
+        return jsonify({"success": False, "message": GEMINI_NOT_CONFIGURED}), 503
+
+    try:
+        start = time.perf_counter()
+        with metrics.span('gemini.chat'):
+            response = await chat.send_message_async(user_message)
+            bot_message = response.text
+        record_llm_call(time.perf_counter() - start)
+        metrics.record_gemini_usage(response)
+    except GeminiUnavailable as e:
+        await save_failed_chat_turn(conversation_id, title, user_message)
+        return jsonify({"success": False, "message": str(e)}), 503
+    except Exception as e:
+        await save_failed_chat_turn(conversation_id, title, user_message)
+        return jsonify({"success": False, "message": f"AI Error: {str(e)}"}), 500
+    store_answer(user_id, history, user_message, bot_message)
+
+    try:
+        await save_chat_turn(conversation_id, title, user_message, bot_message)
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Database error: {str(e)}"}), 500
+
+    return jsonify({"success": True, "response": bot_message})
+
+@async_app.route("/send-message-stream", methods=["POST"])
+async def send_message_stream():
+    """Server-Sent Events version of /send-message, as in app.py"""
+    chat_context, error = await chat_request()
+    if error:
+        return error
+    user_id, conversation_id, user_message, title, history = chat_context
+
+    try:
+        local_reply = route_locally(user_message)
+        if local_reply is None:
+            local_reply = cached_answer(user_id, history, user_message)
+        chat = None
+        if local_reply is None:
+            chat = new_gemini_chat(history, user_message)
+            if chat is None:
+                return jsonify({"success": False, "message": GEMINI_NOT_CONFIGURED}), 503
+    except Exception as e:
+        return jsonify({"success": False, "message": f"AI Error: {str(e)}"}), 500
+
+    stream = None
+    if local_reply is None:
+        start = time.perf_counter()
+        try:
+            stream = await chat.send_message_async(user_message, stream=True)
+        except GeminiUnavailable as e:
+            await save_failed_chat_turn(conversation_id, title, user_message)
+            return jsonify({"success": False, "message": str(e)}), 503
+        except Exception as e:
+            await save_failed_chat_turn(conversation_id, title, user_message)
+            return jsonify({"success": False, "message": f"AI Error: {str(e)}"}), 500
+
+    parts = []
+    saved = False
+
+    async def save_turn():
+        """Save the turn once, with whatever part of the reply was produced"""
+        nonlocal saved
+        if saved:
+            return
+        saved = True
+        await save_chat_turn(conversation_id, title, user_message, ''.join(parts) or None)
+
+    async def save_interrupted_turn():
+        # the model failed or the client went away; shielded so a cancelled
+        # request still finishes the write
+        try:
+            await asyncio.shield(save_turn())
+        except Exception as e:
+            print(f"Error saving message: {e}")
+
+    async def generate():
+        try:
+            try:
+                if local_reply is not None:
+                    parts.append(local_reply)
+                    yield sse_event({"delta": local_reply})
+                else:
+                    chunk = None
+                    async for chunk in stream:
+                        text = chunk.text
+                        if text:
+                            parts.append(text)
+                            yield sse_event({"delta": text})
+                    record_llm_call(time.perf_counter() - start)
+                    metrics.record_span('gemini.stream', time.perf_counter() - start)
+                    metrics.record_gemini_usage(chunk)
+                    store_answer(user_id, history, user_message, ''.join(parts))
+            except Exception as e:
+                await save_interrupted_turn()
+                yield sse_event({"error": f"AI Error: {str(e)}"})
+                return
+
+            try:
+                await save_turn()
+            except Exception as e:
+                yield sse_event({"error": f"Database error: {str(e)}"})
+                return
+            yield sse_event({"done": True})
+        finally:
+            # cancelled or closed when the client disconnects mid-stream
+            await save_interrupted_turn()
+
+    response = Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    # a long reply must not hit Quart's default response timeout
+    response.timeout = None
+    return response
+
+# ==================== RESUME ANALYZER ROUTES ====================
+
+async def analyze_resume(content, original_filename, job_description):
+    """Async counterpart of app.analyze_resume.
+
+    Text extraction stays on the resume worker pool and the cache lookups on
+    the default thread pool; only the Gemini wait runs on the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    if original_filename.endswith('.pdf'):
+        extract, span_name = extract_text_from_pdf, 'extract.pdf'
+    else:
+        extract, span_name = extract_text_from_docx, 'extract.docx'
+    # includes time queued for a free worker
+    with metrics.span(span_name):
+        resume_text = await loop.run_in_executor(flask_module.resume_executor, extract, io.BytesIO(content))
+
+    if not resume_text.strip():
+        return {
+            "filename": original_filename,
+            "error": "Could not extract text from resume"
+        }
+
+    key = cache_key(resume_text, job_description, RESUME_PROMPT_VERSION)
+    cached = None
+    if flask_module.RESUME_CACHE_ENABLED:
+        cached = await loop.run_in_executor(None, flask_module.resume_cache.get, key)
+    if cached:
+        analysis, score = cached
+        return {
+            "filename": original_filename,
+            "score": score,
+            "analysis": analysis
+        }
+
+    try:
+        current_model = flask_module.get_genai_model()
+        if not current_model:
+            return {
+                "filename": original_filename,
+                "error": "Gemini API not configured. Please set GENAI_API_KEY environment variable."
+            }
+
+        with metrics.span('gemini.resume'):
+            response = await current_model.generate_content_async(
+                build_resume_prompt(resume_text, job_description),
+                timeout=RESUME_ANALYSIS_TIMEOUT
+            )
+            analysis = response.text
+        metrics.record_gemini_usage(response)
+        score = extract_score(analysis)
+
+        if flask_module.RESUME_CACHE_ENABLED:
+            await loop.run_in_executor(None, flask_module.resume_cache.put, key, analysis, score)
+
+        return {
+            "filename": original_filename,
+            "score": score,
+            "analysis": analysis
+        }
+    except Exception as e:
+        return {
+            "filename": original_filename,
+            "error": f"Analysis error: {str(e)}"
+        }
+
+@async_app.route("/upload-resume", methods=["POST"])
+async def upload_resume():
+    user_id = await session_user_id()
+    if user_id is None:
+        return not_authenticated()
+
+    form = await request.form
+    uploads = await request.files
+    job_description = form.get('job_description', '')
+
+    if 'resumes' not in uploads:
+        return jsonify({"success": False, "message": "No files uploaded"}), 400
+
+    files = uploads.getlist('resumes')
+
+    if len(files) == 0:
+        return jsonify({"success": False, "message": "No files selected"}), 400
+
+    accepted = []
+    for file in files:
+        if file.filename == '' or not allowed_file(file.filename):
+            continue
+        original_filename = secure_filename(file.filename)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"{user_id}_{timestamp}_{original_filename}"
+        content = file.read()
+        await asyncio.to_thread(retain_upload, filename, content)
+        accepted.append((filename, original_filename, content))
+
+    # Large batches can be queued and polled via /resume-jobs/<job_id>
+    if form.get('async', '').lower() in ('1', 'true', 'yes'):
+        if not accepted:
+            return jsonify({"success": False, "message": "No valid files selected"}), 400
+        job_id = await asyncio.to_thread(flask_module.resume_jobs.submit, user_id, job_description, accepted)
+        return jsonify({
+            "success": True,
+            "job_id": job_id,
+            "status_url": flask_app.url_map.bind('').build('resume_job_status', {'job_id': job_id})
+        }), 202
+
+    tasks = [
+        asyncio.ensure_future(analyze_resume(content, original_filename, job_description))
+        for _, original_filename, content in accepted
+    ]
+
+    # Same overall budget as the threaded route
+    batches = -(-len(tasks) // RESUME_ANALYSIS_WORKERS)
+    if tasks:
+        await asyncio.wait(tasks, timeout=RESUME_ANALYSIS_TIMEOUT * max(batches, 1) + 10)
+
+    results = []
+    saved_results = []
+    for (filename, original_filename, _), task in zip(accepted, tasks):
+        if not task.done():
+            task.cancel()
+            results.append({
+                "filename": original_filename,
+                "error": "Analysis error: timed out"
+            })
+            continue
+        result = task.result()
+        if 'score' in result:
+            saved_results.append((filename, result))
+        results.append(result)
+
+    rows = resume_rows(user_id, saved_results, job_description)
+    if rows:
+        try:
+            with metrics.span('db.save_resumes'):
+                await write_many([(INSERT_RESUMES_SQL, rows)])
+        except Exception as e:
+            print(f"Error saving resume results: {e}")
+
+    results_sorted = sorted([r for r in results if 'score' in r], key=lambda x: x['score'], reverse=True)
+    errors = [r for r in results if 'error' in r]
+
+    return jsonify({
+        "success": True,
+        "results": results_sorted,
+        "errors": errors
+    })
+
+@async_app.route("/get-resume-history", methods=["GET"])
+async def get_resume_history():
+    user_id = await session_user_id()
+    if user_id is None:
+        return not_authenticated()
+
+    try:
+        with metrics.span('db.resume_history'):
+            resumes = await fetch_all(RESUME_HISTORY_SQL, (user_id,))
+    except Exception as e:
+        print(f"Database error: {e}")
+        return database_error()
+
+    for resume in resumes:
+        resume['uploaded_at'] = resume['uploaded_at'].isoformat()
+
+    return jsonify({"success": True, "resumes": resumes})
+
+# ==================== DISPATCH ====================
+
+def closing_flask_app(environ, start_response):
+    """The Flask app, closing its response as WSGI servers do; asgiref does
+    not, and app.py finishes request accounting on close()"""
+    response = flask_app(environ, start_response)
+    try:
+        for chunk in response:
+            yield chunk
+    finally:
+        if hasattr(response, 'close'):
+            response.close()
+
+wsgi_app = WsgiToAsgi(closing_flask_app)
+async_routes = async_app.url_map.bind('')
+
+def async_route(path, method):
+    """The URL rule Quart serves a request with, or None for Flask"""
+    try:
+        rule, _ = async_routes.match(path, method=method, return_rule=True)
+    except (NotFound, MethodNotAllowed):
+        return None
+    return rule.rule
+
+async def timed_async_request(scope, receive, send, route):
+    """Serve an async route, recording its latency once the body is sent.
+
+    The request counts towards the same in-flight gauge as the Flask
+    routes, which are timed and counted by the hooks in app.py.
+    """
+    flask_module.enter_request()
+    timings = metrics.begin_request(route, scope['method'])
+    status = 500
+
+    async def send_and_record_status(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        await send(message)
+
+    try:
+        await async_app(scope, receive, send_and_record_status)
+    finally:
+        flask_module.leave_request()
+        metrics.end_request(timings, status, flask_module.SLOW_REQUEST_SECONDS)
+
+async def application(scope, receive, send):
+    """ASGI entry point: async routes go to Quart, everything else to Flask"""
+    if scope['type'] == 'lifespan':
+        await async_app(scope, receive, send)
+        return
+    route = async_route(scope['path'], scope['method']) if scope['type'] == 'http' else None
+    if route is not None:
+        await timed_async_request(scope, receive, send, route)
+    else:
+        await wsgi_app(scope, receive, send)
@@ -0,0 +1,68 @@
+"""Compare the legacy bag-of-words loop with BowEncoder.
+
+Uses the vocabulary in words.pkl and the patterns in intents.json. Sentences
+are pre-tokenized by whitespace, so only the encoding step is timed and no
+NLTK data is required:
+
+    python benchmarks/bench_bow_encoder.py --repeat 200
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bow_encoder import BowEncoder  # noqa: E402
+
+
+def legacy_bow(sentence_words, words):
+    """The original train.py bow() loop, minus tokenization"""
+    bag = [0] * len(words)
+    for s in sentence_words:
+        for i, w in enumerate(words):
+            if w == s:
+                bag[i] = 1
+    return np.array(bag)
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+
+    encoder = BowEncoder.from_pickle(os.path.join(ROOT, 'words.pkl'))
+    with open(os.path.join(ROOT, 'intents.json')) as file:
+        intents = json.load(file)
+    sentences = [p.lower().split() for intent in intents['intents'] for p in intent['patterns']]
+
+    # Both implementations must agree before timing them
+    legacy = np.array([legacy_bow(s, encoder.words) for s in sentences])
+    assert np.array_equal(legacy, encoder.encode_tokens_batch(sentences))
+
+    n = len(sentences)
+    legacy_time = timed(lambda: [legacy_bow(s, encoder.words) for s in sentences], args.repeat)
+    single_time = timed(lambda: [encoder.encode_tokens(s) for s in sentences], args.repeat)
+    batch_time = timed(lambda: encoder.encode_tokens_batch(sentences), args.repeat)
+
+    print(f"{n} sentences, vocabulary of {len(encoder)} words")
+    print(f"{'implementation':<28}{'us/sentence':>12}{'speedup':>10}")
+    for name, seconds in (('legacy bow() loop', legacy_time),
+                          ('BowEncoder.encode_tokens', single_time),
+                          ('BowEncoder batch', batch_time)):
+        print(f"{name:<28}{seconds / n * 1e6:>12.2f}{legacy_time / seconds:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Load-test the Gemini resilience layer against the offline fake backend.
+
+Concurrent callers hit a FakeGeminiModel that answers 429 above its quota
+and fails at a configurable rate, once directly and once through
+ResilientGeminiModel. A final scenario simulates an outage to show the
+circuit breaker failing fast. No API key or network is needed:
+
+    python benchmarks/bench_gemini_resilience.py --callers 32 --requests 10
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_gemini import FakeGeminiModel  # noqa: E402
+from gemini_client import GeminiUnavailable, ResilientGeminiModel  # noqa: E402
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)] if values else 0.0
+
+
+def load(model, callers, requests):
+    outcomes = {'ok': 0, 'shed (503)': 0, 'error': 0}
+    latencies = []
+
+    def call(_):
+        start = time.perf_counter()
+        try:
+            model.generate_content("ping")
+            outcome = 'ok'
+        except GeminiUnavailable:
+            outcome = 'shed (503)'
+        except Exception:
+            outcome = 'error'
+        return outcome, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        for outcome, seconds in pool.map(call, range(callers * requests)):
+            outcomes[outcome] += 1
+            latencies.append(seconds * 1000)
+    return outcomes, latencies, time.perf_counter() - start
+
+
+def report(name, outcomes, latencies, elapsed, model=None):
+    total = sum(outcomes.values())
+    print(f"\n{name}: {total} calls in {elapsed:.1f}s")
+    print("  " + ", ".join(f"{k} {v / total:.0%}" for k, v in outcomes.items()))
+    print(f"  latency ms p50 {percentile(latencies, 0.5):.0f}, p95 {percentile(latencies, 0.95):.0f}, "
+          f"max {max(latencies):.0f}")
+    if model is not None:
+        stats = model.stats()
+        print(f"  retries {stats['retries']}, timeouts {stats['timeouts']}, rejected {stats['rejected']}, "
+              f"circuit {stats['circuit']} (trips {stats['circuit_trips']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--callers', type=int, default=32, help='concurrent callers')
+    parser.add_argument('--requests', type=int, default=10, help='calls per caller')
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--error-rate', type=float, default=0.05, help='fraction of fake 503s')
+    parser.add_argument('--quota', type=int, default=8, help='concurrent calls the fake accepts before 429')
+    args = parser.parse_args()
+
+    def backend(error_rate=args.error_rate):
+        return FakeGeminiModel(latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 4,
+                               error_rate=error_rate, max_concurrency=args.quota)
+
+    def wrapped(error_rate=args.error_rate):
+        return ResilientGeminiModel(backend(error_rate), timeout=2, deadline=10, backoff_base=0.05,
+                                    backoff_max=1, max_concurrency=args.quota, queue_timeout=5,
+                                    breaker_failures=5, breaker_reset=30)
+
+    report("bare model", *load(backend(), args.callers, args.requests))
+    model = wrapped()
+    report("resilient wrapper", *load(model, args.callers, args.requests), model)
+    model = wrapped(error_rate=1.0)
+    report("resilient wrapper, upstream outage", *load(model, args.callers, args.requests), model)
+
+
+if __name__ == '__main__':
+    main()
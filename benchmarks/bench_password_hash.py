@@ -0,0 +1,80 @@
+"""Measure password verification throughput at several hash costs.
+
+For each PASSWORD_HASH_METHOD candidate, one thread verifies a password
+repeatedly to give the single-core cost, then a PasswordHasher pool with one
+worker per core verifies as many as it can, as the app's login route does.
+Logins per second per core is the pool throughput divided by the cores in
+use; scrypt also needs 128 * N * r bytes of memory per concurrent hash:
+
+    python benchmarks/bench_password_hash.py --seconds 3
+    python benchmarks/bench_password_hash.py --method pbkdf2:sha256:600000 --method scrypt:16384:8:1
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passwords import PasswordHasher, hash_password  # noqa: E402
+from werkzeug.security import check_password_hash  # noqa: E402
+
+DEFAULT_METHODS = [
+    'pbkdf2:sha256:100000',
+    'pbkdf2:sha256:600000',
+    'pbkdf2:sha256:1000000',
+    'scrypt:16384:8:1',
+    'scrypt:32768:8:1',
+    'scrypt:65536:8:1',
+]
+
+
+def single_thread(password_hash, seconds):
+    """Verifications per second on one thread"""
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        check_password_hash(password_hash, 'correct horse battery staple')
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def pooled(method, password_hash, workers, seconds):
+    """Verifications per second through a PasswordHasher with `workers` threads"""
+    hasher = PasswordHasher(method, workers=workers, max_pending=workers * 4)
+    deadline = time.perf_counter() + seconds
+    count = 0
+
+    def caller():
+        done = 0
+        while time.perf_counter() < deadline:
+            hasher.verify(password_hash, 'correct horse battery staple')
+            done += 1
+        return done
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers * 2) as callers:
+        for done in callers.map(lambda _: caller(), range(workers * 2)):
+            count += done
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--method', action='append', help='werkzeug hash method (repeatable)')
+    parser.add_argument('--seconds', type=float, default=2.0, help='measurement time per method and mode')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='pool threads (default: cores)')
+    args = parser.parse_args()
+
+    print(f"{'method':<24} {'verify ms':>10} {'1 core/s':>10} {'pool/s':>10} {'per core/s':>11}")
+    for method in args.method or DEFAULT_METHODS:
+        password_hash = hash_password('correct horse battery staple', method)
+        per_second = single_thread(password_hash, args.seconds)
+        pool_per_second = pooled(method, password_hash, args.workers, args.seconds)
+        print(f"{method:<24} {1000 / per_second:>10.1f} {per_second:>10.1f} {pool_per_second:>10.1f} "
+              f"{pool_per_second / args.workers:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
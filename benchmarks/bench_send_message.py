@@ -0,0 +1,142 @@
+"""Count database round trips per /send-message request.
+
+Runs the real Flask routes against an in-process fake MySQL connection and a
+fake Gemini model, so no database or API key is needed:
+
+    python benchmarks/bench_send_message.py --requests 200 --rtt-ms 0.5
+
+Every execute/executemany/commit/rollback sent to the fake connection counts
+as one round trip; --rtt-ms adds simulated network latency to each.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('RESUME_JOBS_DB', os.path.join(tempfile.mkdtemp(), 'bench_jobs.sqlite3'))
+
+import app as chat_app  # noqa: E402
+
+
+class RoundTripCounter:
+    def __init__(self, rtt):
+        self.rtt = rtt
+        self.count = 0
+        self.borrowed = 0
+
+    def hit(self):
+        self.count += 1
+        if self.rtt:
+            time.sleep(self.rtt)
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.counter = conn.counter
+        self.history = conn.history
+        self.rows = []
+        self.lastrowid = 1
+
+    def execute(self, query, params=None):
+        self.counter.hit()
+        self.conn.in_transaction = True
+        if query.lstrip().upper().startswith("SELECT"):
+            self.rows = [{'title': 'Benchmark', 'sender': sender, 'content': content} for sender, content in self.history]
+
+    def executemany(self, query, rows):
+        self.counter.hit()
+        self.conn.in_transaction = True
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, counter, history):
+        self.counter = counter
+        self.history = history
+        self.in_transaction = False
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.counter.hit()
+        self.in_transaction = False
+
+    def rollback(self):
+        self.counter.hit()
+        self.in_transaction = False
+
+    def close(self):
+        # Mirror db_pool: unfinished transactions are rolled back on release
+        if self.in_transaction:
+            self.rollback()
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeChat:
+    def send_message(self, message, stream=False):
+        if stream:
+            return iter([FakeResponse("Hello "), FakeResponse("there")])
+        return FakeResponse("Hello there")
+
+
+class FakeModel:
+    def start_chat(self, history=None):
+        return FakeChat()
+
+
+def run(route, requests, counter, history_turns):
+    history = [('user' if i % 2 == 0 else 'bot', f"message {i}") for i in range(history_turns)]
+
+    def get_db():
+        counter.borrowed += 1
+        return FakeConnection(counter, history)
+
+    chat_app.get_db = get_db
+    chat_app.get_genai_model = lambda: FakeModel()
+    client = chat_app.app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+        sess['username'] = 'bench'
+
+    counter.count = counter.borrowed = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.post(route, json={'conversation_id': 1, 'message': 'hi'})
+        response.get_data()
+        assert response.status_code == 200, response.get_data(as_text=True)
+    elapsed = time.perf_counter() - start
+    return counter.count / requests, counter.borrowed / requests, elapsed / requests * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--rtt-ms', type=float, default=0.0, help='simulated latency per round trip')
+    parser.add_argument('--history', type=int, default=30, help='stored messages in the conversation')
+    args = parser.parse_args()
+
+    counter = RoundTripCounter(args.rtt_ms / 1000)
+    print(f"{'route':<24}{'round trips/req':>18}{'connections/req':>18}{'ms/req':>10}")
+    for route in ('/send-message', '/send-message-stream'):
+        trips, borrowed, ms = run(route, args.requests, counter, args.history)
+        print(f"{route:<24}{trips:>18.1f}{borrowed:>18.1f}{ms:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Compare intent-model startup: pickle + JSON + model file vs the intent bundle.
+
+Each loading path runs in a fresh interpreter, so imports (e.g. Keras) count
+towards its startup time. Artifacts come from model_artifacts/CURRENT or the
+repository root; without a trained model, random weights of the training
+script's shape are used. The Keras path is skipped when Keras or the .h5
+file is unavailable:
+
+    python benchmarks/bench_startup.py --repeat 5
+"""
+import argparse
+import importlib.util
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def load_keras(args):
+    import json
+    import pickle
+    from keras.models import load_model
+    load_model(args.h5)
+    words = pickle.load(open(args.words, "rb"))
+    classes = pickle.load(open(args.classes, "rb"))
+    intents = json.loads(open(args.intents).read())
+    return words, classes, intents
+
+
+def load_npz(args):
+    from intent_artifacts import load_vocabulary
+    from intent_responses import IntentResponses
+    from numpy_model import NumpyIntentModel
+    model = NumpyIntentModel.load(args.npz)
+    words, classes = load_vocabulary({"words": args.words, "classes": args.classes})
+    return model, words, classes, IntentResponses(args.intents)
+
+
+def load_intent_bundle(args):
+    from intent_bundle import load_bundle
+    from intent_responses import IntentResponses
+    bundle = load_bundle(args.bundle)
+    return bundle, IntentResponses(None, intents=bundle.intents)
+
+
+VARIANTS = {
+    "keras h5 + pickle + json": load_keras,
+    "numpy npz + pickle + json": load_npz,
+    "intent bundle (mmap)": load_intent_bundle,
+}
+
+
+def run_child(args):
+    import numpy  # noqa: F401  common to every path, not timed
+    start = time.perf_counter()
+    VARIANTS[args.variant](args)
+    print(time.perf_counter() - start)
+
+
+def prepare(workdir):
+    """Artifact paths, generating random weights and a bundle where missing"""
+    import numpy as np
+
+    from intent_artifacts import current_artifacts, load_vocabulary
+    from intent_bundle import build_bundle
+    from numpy_model import NumpyIntentModel
+
+    artifacts = current_artifacts(ROOT)
+    paths = {
+        "words": artifacts["words"],
+        "classes": artifacts["classes"],
+        "intents": os.path.join(ROOT, "intents.json"),
+        "h5": artifacts["model_h5"],
+        "npz": artifacts["model_npz"],
+        "bundle": artifacts["bundle"],
+    }
+    words, classes = load_vocabulary(artifacts)
+    if not os.path.exists(paths["npz"]):
+        rng = np.random.default_rng(0)
+        sizes = [len(words), 128, 64, len(classes)]
+        arrays = {}
+        for i in range(3):
+            arrays[f"kernel_{i}"] = rng.standard_normal((sizes[i], sizes[i + 1])).astype(np.float32)
+            arrays[f"bias_{i}"] = np.zeros(sizes[i + 1], dtype=np.float32)
+        paths["npz"] = os.path.join(workdir, "chatbot_model.npz")
+        np.savez(paths["npz"], activations=np.array(["relu", "relu", "softmax"]), **arrays)
+        NumpyIntentModel.load(paths["npz"])
+    if not os.path.exists(paths["bundle"]):
+        paths["bundle"] = os.path.join(workdir, "intent_bundle.bin")
+        build_bundle(paths["bundle"], words, classes, paths["npz"], paths["intents"])
+    return paths
+
+
+def keras_available():
+    return importlib.util.find_spec("keras") is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--variant", help=argparse.SUPPRESS)
+    for name in ("words", "classes", "intents", "h5", "npz", "bundle"):
+        parser.add_argument(f"--{name}", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.variant:
+        run_child(args)
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = prepare(workdir)
+        flags = [f"--{name}={path}" for name, path in paths.items()]
+        print(f"{'loading path':<28}{'median ms':>12}{'min ms':>10}")
+        baseline = None
+        for variant in VARIANTS:
+            if variant.startswith("keras") and not (os.path.exists(paths["h5"]) and keras_available()):
+                print(f"{variant:<28}{'skipped':>12}")
+                continue
+            times = []
+            for _ in range(args.repeat):
+                output = subprocess.run([sys.executable, __file__, f"--variant={variant}"] + flags,
+                                        capture_output=True, text=True, check=True).stdout
+                times.append(float(output.strip().splitlines()[-1]) * 1000)
+            median = statistics.median(times)
+            baseline = baseline or median
+            print(f"{variant:<28}{median:>12.2f}{min(times):>10.2f}   {baseline / median:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import os
+import pickle
+from functools import lru_cache
+
+import nltk
+import numpy as np
+from nltk.stem import WordNetLemmatizer
+
+lemmatizer = WordNetLemmatizer()
+
+# Chat traffic and intent patterns reuse a small set of words, so lemmas (and
+# optionally whole cleaned sentences) are memoized. 0 disables a cache.
+LEMMA_CACHE_SIZE = int(os.environ.get("LEMMA_CACHE_SIZE", 50000))
+SENTENCE_CACHE_SIZE = int(os.environ.get("SENTENCE_CACHE_SIZE", 10000))
+
+
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def _lemmatize(word):
+    return lemmatizer.lemmatize(word)
+
+
+def lemmatize(word):
+    """Lemma of a lower-cased word, memoized"""
+    return _lemmatize(word.lower())
+
+
+@lru_cache(maxsize=SENTENCE_CACHE_SIZE)
+def _clean_up_sentence(sentence):
+    return tuple(lemmatize(word) for word in nltk.word_tokenize(sentence))
+
+
+def clean_up_sentence(sentence):
+    """Tokenize a sentence and lemmatize each lower-cased word"""
+    return list(_clean_up_sentence(sentence))
+
+
+def warm_up():
+    """Load the tokenizer and WordNet now instead of on the first request"""
+    try:
+        nltk.word_tokenize("warm up")
+        lemmatizer.lemmatize("warming")
+    except LookupError as e:
+        print(f"Error warming up NLTK: {e}")
+
+
+def cache_stats():
+    """Hit rates of the lemma and sentence caches"""
+    stats = {}
+    for name, cached in (("lemma", _lemmatize), ("sentence", _clean_up_sentence)):
+        info = cached.cache_info()
+        lookups = info.hits + info.misses
+        stats[name] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "max_size": info.maxsize,
+            "hit_rate": info.hits / lookups if lookups else 0.0,
+        }
+    return stats
+
+
+class BowEncoder:
+    """Bag-of-words encoder over a fixed vocabulary (e.g. words.pkl).
+
+    The word-to-column mapping is built once, so encoding a sentence costs one
+    dict lookup per token instead of a scan over the whole vocabulary. Vectors
+    are float32 NumPy arrays with a 1 for every vocabulary word present.
+    """
+
+    def __init__(self, words):
+        self.words = list(words)
+        self.index = {w: i for i, w in enumerate(self.words)}
+
+    @classmethod
+    def from_pickle(cls, path="words.pkl"):
+        with open(path, "rb") as file:
+            return cls(pickle.load(file))
+
+    def __len__(self):
+        return len(self.words)
+
+    def encode_tokens(self, tokens):
+        """Encode already cleaned tokens as a 1-D vector"""
+        bag = np.zeros(len(self.words), dtype=np.float32)
+        columns = [self.index[t] for t in tokens if t in self.index]
+        bag[columns] = 1.0
+        return bag
+
+    def encode_tokens_batch(self, token_lists):
+        """Encode many token lists at once as a (n, vocabulary) matrix"""
+        matrix = np.zeros((len(token_lists), len(self.words)), dtype=np.float32)
+        rows = []
+        columns = []
+        for row, tokens in enumerate(token_lists):
+            for t in tokens:
+                column = self.index.get(t)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+        matrix[rows, columns] = 1.0
+        return matrix
+
+    def encode(self, sentence):
+        """Tokenize, lemmatize and encode one sentence"""
+        return self.encode_tokens(clean_up_sentence(sentence))
+
+    def encode_batch(self, sentences):
+        """Tokenize, lemmatize and encode many sentences as a matrix"""
+        return self.encode_tokens_batch([clean_up_sentence(s) for s in sentences])
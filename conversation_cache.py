@@ -0,0 +1,63 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ConversationOwnerCache:
+    """In-memory cache of conversation owners and titles.
+
+    A hit lets a route trust that `user_id` owns a conversation without
+    querying `conversations`. Entries expire after `ttl` seconds and the
+    least recently used are evicted beyond `max_entries`. The cache is per
+    process, so a conversation deleted through another worker can stay
+    cached here for up to `ttl` seconds; writes to it then fail on the
+    messages foreign key rather than reaching another user's data.
+    """
+
+    def __init__(self, ttl=300, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # conversation_id -> (user_id, title, expires_at), oldest use first
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, user_id, conversation_id):
+        """The conversation's title if `user_id` is known to own it, else None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(conversation_id)
+            if entry is None or entry[0] != user_id or entry[2] <= now:
+                if entry is not None and entry[2] <= now:
+                    del self._entries[conversation_id]
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries.move_to_end(conversation_id)
+            return entry[1]
+
+    def put(self, user_id, conversation_id, title):
+        with self._lock:
+            self._entries[conversation_id] = (user_id, title, time.monotonic() + self.ttl)
+            self._entries.move_to_end(conversation_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def discard(self, conversation_id):
+        """Forget a conversation, e.g. once it is deleted or renamed"""
+        with self._lock:
+            self._entries.pop(conversation_id, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,186 @@
+import threading
+import time
+import weakref
+from collections import deque
+
+import mysql.connector
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be borrowed within the borrow timeout."""
+
+
+class PooledConnection:
+    """Proxy around a MySQL connection that returns it to the pool on close().
+
+    A proxy that is dropped without close() (e.g. an exception between
+    borrowing and closing) still returns its connection: garbage collection
+    only queues it, and the pool releases it on its next connect() or
+    release, counting it as `leaked`.
+    """
+
+    def __init__(self, pool, conn, created_at):
+        self._pool = pool
+        self._conn = conn
+        self.created_at = created_at
+        # runs inside GC on any thread, possibly one holding the pool lock,
+        # so it must not lock or touch the network
+        self._leak_guard = weakref.finalize(self, pool._leaked.append, (conn, created_at))
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._leak_guard.detach()
+            self._pool._release(conn, self.created_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    """Bounded MySQL connection pool.
+
+    Connections are created lazily up to `size`. Borrowers wait up to `timeout`
+    seconds for a free connection, idle connections are pinged before reuse
+    when they have sat for longer than `ping_interval`, and connections older
+    than `recycle` seconds are closed and replaced.
+    """
+
+    def __init__(self, db_config, size=10, timeout=5.0, recycle=3600, ping_interval=30):
+        self.db_config = db_config
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_interval = ping_interval
+        self._idle = []  # (conn, created_at, returned_at), most recent last
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._in_use = 0
+        # (conn, created_at) of proxies collected without close()
+        self._leaked = deque()
+        self._stats = {
+            'borrowed': 0,
+            'created': 0,
+            'recycled': 0,
+            'failed_health_checks': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'leaked': 0,
+            'wait_time_total': 0.0,
+            'peak_in_use': 0,
+        }
+
+    def connect(self):
+        """Borrow a connection, raising PoolTimeout if the pool stays saturated."""
+        self._release_leaked()
+        start = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats['waits'] += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._lock:
+                    self._stats['timeouts'] += 1
+                    self._stats['wait_time_total'] += time.monotonic() - start
+                raise PoolTimeout(f"No database connection available within {self.timeout}s")
+        try:
+            conn, created_at = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._in_use += 1
+            self._stats['borrowed'] += 1
+            self._stats['wait_time_total'] += time.monotonic() - start
+            self._stats['peak_in_use'] = max(self._stats['peak_in_use'], self._in_use)
+        return PooledConnection(self, conn, created_at)
+
+    def _checkout(self):
+        while True:
+            with self._lock:
+                entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                break
+            conn, created_at, returned_at = entry
+            now = time.monotonic()
+            if now - created_at > self.recycle:
+                self._count('recycled')
+                self._discard(conn)
+                continue
+            if now - returned_at > self.ping_interval and not self._is_healthy(conn):
+                self._count('failed_health_checks')
+                self._discard(conn)
+                continue
+            return conn, created_at
+        conn = mysql.connector.connect(**self.db_config)
+        self._count('created')
+        return conn, time.monotonic()
+
+    def _release(self, conn, created_at):
+        self._return(conn, created_at)
+        self._release_leaked()
+
+    def _return(self, conn, created_at):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            healthy = time.monotonic() - created_at <= self.recycle
+        except mysql.connector.Error:
+            healthy = False
+        if healthy:
+            with self._lock:
+                self._idle.append((conn, created_at, time.monotonic()))
+        else:
+            self._count('recycled')
+            self._discard(conn)
+        with self._lock:
+            self._in_use -= 1
+        self._slots.release()
+
+    def _release_leaked(self):
+        while True:
+            try:
+                conn, created_at = self._leaked.popleft()
+            except IndexError:
+                return
+            self._count('leaked')
+            self._return(conn, created_at)
+
+    def _is_healthy(self, conn):
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except mysql.connector.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except mysql.connector.Error:
+            pass
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def stats(self):
+        """Snapshot of pool usage, including how saturated the pool is."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = self.size
+            stats['in_use'] = self._in_use
+            stats['idle'] = len(self._idle)
+            stats['saturation'] = self._in_use / self.size if self.size else 0.0
+        return stats
+
+    def close_idle(self):
+        """Close every idle connection (e.g. on shutdown)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _, _ in idle:
+            self._discard(conn)
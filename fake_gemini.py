@@ -0,0 +1,107 @@
+import asyncio
+import random
+import threading
+import time
+
+
+class FakeGeminiError(Exception):
+    """Shaped like google.api_core errors: `code` is the HTTP status"""
+
+    def __init__(self, code, message):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """Offline stand-in for genai.GenerativeModel, for load tests and demos.
+
+    Each call sleeps for `latency_ms` (+/- `jitter_ms`), fails with a 503 at
+    `error_rate`, and answers 429 once more than `max_concurrency` calls are
+    in flight. A call that would outlast its request timeout raises 504.
+    Enabled in app.py with GEMINI_FAKE=1.
+    """
+
+    def __init__(self, latency_ms=500, jitter_ms=200, error_rate=0.0, max_concurrency=None, stream_chunks=5):
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.error_rate = error_rate
+        self.max_concurrency = max_concurrency
+        self.stream_chunks = stream_chunks
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def _begin(self):
+        with self._lock:
+            if self.max_concurrency and self._in_flight >= self.max_concurrency:
+                raise FakeGeminiError(429, "Resource has been exhausted")
+            self._in_flight += 1
+        return max(self.latency + random.uniform(-self.jitter, self.jitter), 0.0)
+
+    def _end(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _reply(self, prompt):
+        if random.random() < self.error_rate:
+            raise FakeGeminiError(503, "The model is overloaded")
+        return f"Fake reply to: {str(prompt)[:80]}\n\nSCORE: {random.randint(40, 95)}"
+
+    def _respond(self, prompt, request_options=None):
+        latency = self._begin()
+        try:
+            timeout = (request_options or {}).get('timeout')
+            if timeout is not None and latency > timeout:
+                time.sleep(timeout)
+                raise FakeGeminiError(504, "Deadline Exceeded")
+            time.sleep(latency)
+            return self._reply(prompt)
+        finally:
+            self._end()
+
+    async def _respond_async(self, prompt, request_options=None):
+        latency = self._begin()
+        try:
+            timeout = (request_options or {}).get('timeout')
+            if timeout is not None and latency > timeout:
+                await asyncio.sleep(timeout)
+                raise FakeGeminiError(504, "Deadline Exceeded")
+            await asyncio.sleep(latency)
+            return self._reply(prompt)
+        finally:
+            self._end()
+
+    def generate_content(self, contents, request_options=None, **kwargs):
+        return FakeResponse(self._respond(contents, request_options))
+
+    async def generate_content_async(self, contents, request_options=None, **kwargs):
+        return FakeResponse(await self._respond_async(contents, request_options))
+
+    def start_chat(self, history=None):
+        return FakeChat(self)
+
+
+async def _iterate(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+class FakeChat:
+    def __init__(self, model):
+        self.model = model
+
+    def send_message(self, content, stream=False, request_options=None, **kwargs):
+        text = self.model._respond(content, request_options)
+        return iter(self._chunks(text)) if stream else FakeResponse(text)
+
+    def _chunks(self, text):
+        size = max(len(text) // self.model.stream_chunks, 1)
+        return [FakeResponse(text[i:i + size]) for i in range(0, len(text), size)]
+
+    async def send_message_async(self, content, stream=False, request_options=None, **kwargs):
+        text = await self.model._respond_async(content, request_options)
+        return _iterate(self._chunks(text)) if stream else FakeResponse(text)
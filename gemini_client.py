@@ -0,0 +1,335 @@
+import asyncio
+import random
+import threading
+import time
+import weakref
+
+# HTTP statuses worth retrying: rate limited, server errors, upstream timeouts.
+# google.api_core exceptions expose theirs as `.code`.
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class GeminiUnavailable(Exception):
+    """Gemini was not called: the circuit is open or no capacity freed up in time.
+    Routes answer these with 503."""
+
+
+def is_retryable(error):
+    return getattr(error, 'code', None) in RETRYABLE_STATUS or isinstance(error, TimeoutError)
+
+
+class TokenBucket:
+    """Allows `rate_per_minute` calls per minute with bursts of up to `burst`"""
+
+    def __init__(self, rate_per_minute, burst=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst or max(1, int(rate_per_minute / 60.0) or 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self):
+        """Take a token; returns 0, or the seconds until one is available"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            wait_for = self._take()
+            if not wait_for:
+                return True
+            if time.monotonic() + wait_for > deadline:
+                return False
+            time.sleep(wait_for)
+
+    async def acquire_async(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            wait_for = self._take()
+            if not wait_for:
+                return True
+            if time.monotonic() + wait_for > deadline:
+                return False
+            await asyncio.sleep(wait_for)
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures and rejects calls
+    for `reset_timeout` seconds, then lets a single trial call through."""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            now = time.monotonic()
+            if now - self.opened_at < self.reset_timeout:
+                return False
+            # let one trial call through per reset_timeout until one succeeds
+            self.state = 'half-open'
+            self.opened_at = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half-open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.trips += 1
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+
+class _StreamingResponse:
+    """Iterates a streamed reply and frees its concurrency slot when done,
+    or when dropped without being consumed."""
+
+    def __init__(self, response, release):
+        self._response = response
+        self._release = weakref.finalize(self, release)
+
+    def __iter__(self):
+        try:
+            yield from self._response
+        finally:
+            self._release()
+
+
+class _AsyncStreamingResponse:
+    """Async counterpart of _StreamingResponse"""
+
+    def __init__(self, response, release):
+        self._response = response
+        self._release = weakref.finalize(self, release)
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._response:
+                yield chunk
+        finally:
+            self._release()
+
+
+class ResilientGeminiModel:
+    """Wraps a GenerativeModel with deadlines, retries and load shedding.
+
+    Every call gets a per-attempt `timeout` inside an overall `deadline`.
+    Rate-limit and server errors are retried with jittered exponential
+    backoff. At most `max_concurrency` calls are in flight per process (and
+    optionally `rate_per_minute` start per minute); a caller that cannot get
+    a slot within `queue_timeout` gets GeminiUnavailable, as does every
+    caller while the circuit breaker is open.
+
+    The *_async methods use Gemini's async API for the ASGI serving mode.
+    They share the breaker, quota and counters; their concurrency limit is
+    a separate asyncio semaphore of the same size, created on first use in
+    the serving event loop.
+    """
+
+    def __init__(self, model, timeout=30, deadline=60, max_retries=3, backoff_base=0.5, backoff_max=8,
+                 max_concurrency=8, queue_timeout=5, rate_per_minute=0, breaker_failures=5, breaker_reset=30):
+        self.model = model
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.queue_timeout = queue_timeout
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._async_slots = None
+        self._bucket = TokenBucket(rate_per_minute) if rate_per_minute else None
+        self.breaker = CircuitBreaker(breaker_failures, breaker_reset)
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(('calls', 'succeeded', 'failed', 'retries', 'timeouts', 'rejected'), 0)
+        self._in_flight = 0
+
+    def _count(self, name, delta=1):
+        with self._lock:
+            self._counts[name] += delta
+
+    def _acquire(self):
+        if not self.breaker.allow():
+            self._count('rejected')
+            raise GeminiUnavailable("Gemini is temporarily unavailable, please try again shortly")
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self._count('rejected')
+            raise GeminiUnavailable("Too many Gemini requests in progress, please try again shortly")
+        if self._bucket and not self._bucket.acquire(self.queue_timeout):
+            self._slots.release()
+            self._count('rejected')
+            raise GeminiUnavailable("Gemini request quota reached, please try again shortly")
+        with self._lock:
+            self._in_flight += 1
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    async def _acquire_async(self):
+        if self._async_slots is None:
+            self._async_slots = asyncio.BoundedSemaphore(self.max_concurrency)
+        if not self.breaker.allow():
+            self._count('rejected')
+            raise GeminiUnavailable("Gemini is temporarily unavailable, please try again shortly")
+        try:
+            await asyncio.wait_for(self._async_slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._count('rejected')
+            raise GeminiUnavailable("Too many Gemini requests in progress, please try again shortly")
+        if self._bucket and not await self._bucket.acquire_async(self.queue_timeout):
+            self._async_slots.release()
+            self._count('rejected')
+            raise GeminiUnavailable("Gemini request quota reached, please try again shortly")
+        with self._lock:
+            self._in_flight += 1
+
+    def _release_async(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._async_slots.release()
+
+    def _retry_delay(self, error, retries, deadline):
+        """Seconds to wait before retrying after `error`, or None to give up"""
+        if getattr(error, 'code', None) == 504 or isinstance(error, TimeoutError):
+            self._count('timeouts')
+        if not is_retryable(error):
+            # the request itself was bad; upstream is healthy
+            self.breaker.record_success()
+            self._count('failed')
+            return None
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** retries))
+        if retries >= self.max_retries or time.monotonic() + delay >= deadline:
+            self.breaker.record_failure()
+            self._count('failed')
+            return None
+        self._count('retries')
+        return delay
+
+    def _succeeded(self):
+        self.breaker.record_success()
+        self._count('succeeded')
+
+    def _call(self, attempt, timeout=None):
+        """Run attempt(timeout_seconds) with retries; the caller holds a slot"""
+        self._count('calls')
+        deadline = time.monotonic() + max(self.deadline, timeout or 0)
+        retries = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                result = attempt(max(min(timeout or self.timeout, remaining), 0.1))
+            except Exception as e:
+                delay = self._retry_delay(e, retries, deadline)
+                if delay is None:
+                    raise
+                retries += 1
+                time.sleep(delay)
+                continue
+            self._succeeded()
+            return result
+
+    async def _call_async(self, attempt, timeout=None):
+        """Await attempt(timeout_seconds) with retries; the caller holds a slot"""
+        self._count('calls')
+        deadline = time.monotonic() + max(self.deadline, timeout or 0)
+        retries = 0
+        while True:
+            attempt_timeout = max(min(timeout or self.timeout, deadline - time.monotonic()), 0.1)
+            try:
+                result = await asyncio.wait_for(attempt(attempt_timeout), attempt_timeout)
+            except Exception as e:
+                delay = self._retry_delay(e, retries, deadline)
+                if delay is None:
+                    raise
+                retries += 1
+                await asyncio.sleep(delay)
+                continue
+            self._succeeded()
+            return result
+
+    def generate_content(self, contents, timeout=None, **kwargs):
+        self._acquire()
+        try:
+            return self._call(lambda t: self.model.generate_content(
+                contents, request_options={'timeout': t}, **kwargs), timeout)
+        finally:
+            self._release()
+
+    async def generate_content_async(self, contents, timeout=None, **kwargs):
+        await self._acquire_async()
+        try:
+            return await self._call_async(lambda t: self.model.generate_content_async(
+                contents, request_options={'timeout': t}, **kwargs), timeout)
+        finally:
+            self._release_async()
+
+    def start_chat(self, history=None):
+        return ResilientChat(self, self.model.start_chat(history=history))
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counts, in_flight=self._in_flight, max_concurrency=self.max_concurrency)
+        stats['circuit'] = self.breaker.state
+        stats['circuit_trips'] = self.breaker.trips
+        return stats
+
+
+class ResilientChat:
+    """ChatSession counterpart of ResilientGeminiModel.
+
+    A streamed reply keeps its concurrency slot until it has been read.
+    Only the request that opens the stream is retried; an error part-way
+    through a reply is passed to the caller.
+    """
+
+    def __init__(self, client, chat):
+        self.client = client
+        self.chat = chat
+
+    def send_message(self, content, stream=False, timeout=None, **kwargs):
+        self.client._acquire()
+        try:
+            response = self.client._call(lambda t: self.chat.send_message(
+                content, stream=stream, request_options={'timeout': t}, **kwargs), timeout)
+        except BaseException:
+            self.client._release()
+            raise
+        if stream:
+            return _StreamingResponse(response, self.client._release)
+        self.client._release()
+        return response
+
+    async def send_message_async(self, content, stream=False, timeout=None, **kwargs):
+        await self.client._acquire_async()
+        try:
+            response = await self.client._call_async(lambda t: self.chat.send_message_async(
+                content, stream=stream, request_options={'timeout': t}, **kwargs), timeout)
+        except BaseException:
+            self.client._release_async()
+            raise
+        if stream:
+            return _AsyncStreamingResponse(response, self.client._release_async)
+        self.client._release_async()
+        return response
@@ -0,0 +1,99 @@
+import json
+import os
+import pickle
+import shutil
+import time
+
+from intent_bundle import build_bundle
+
+ARTIFACTS_DIR = "model_artifacts"
+POINTER_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+
+WORDS_FILE = "words.pkl"
+CLASSES_FILE = "classes.pkl"
+MODEL_H5_FILE = "chatbot_model.h5"
+MODEL_NPZ_FILE = "chatbot_model.npz"
+BUNDLE_FILE = "intent_bundle.bin"
+
+
+def _paths(base, version):
+    return {
+        "version": version,
+        "dir": base,
+        "words": os.path.join(base, WORDS_FILE),
+        "classes": os.path.join(base, CLASSES_FILE),
+        "model_h5": os.path.join(base, MODEL_H5_FILE),
+        "model_npz": os.path.join(base, MODEL_NPZ_FILE),
+        "bundle": os.path.join(base, BUNDLE_FILE),
+        "manifest": os.path.join(base, MANIFEST_FILE),
+    }
+
+
+def current_artifacts(root="."):
+    """Paths of the artifact set to serve.
+
+    Training publishes words, classes and model weights together in a
+    versioned directory and then flips the CURRENT pointer, so reading the
+    pointer once yields a matching set. Trees that were never trained
+    incrementally fall back to the files in `root`.
+    """
+    pointer = os.path.join(root, ARTIFACTS_DIR, POINTER_FILE)
+    try:
+        with open(pointer) as file:
+            version = file.read().strip()
+    except FileNotFoundError:
+        return _paths(root, None)
+    return _paths(os.path.join(root, ARTIFACTS_DIR, version), version)
+
+
+def load_manifest(paths):
+    try:
+        with open(paths["manifest"]) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def load_vocabulary(paths):
+    """(words, classes) of an artifact set"""
+    with open(paths["words"], "rb") as file:
+        words = pickle.load(file)
+    with open(paths["classes"], "rb") as file:
+        classes = pickle.load(file)
+    return words, classes
+
+
+def publish_artifacts(words, classes, model_h5, model_npz, manifest, intents_path="intents.json", root="."):
+    """Copy a complete artifact set into a new version and make it current.
+
+    `model_h5`/`model_npz` are paths of freshly written files. Alongside
+    them a serving bundle (see intent_bundle.py) is built. The CURRENT
+    pointer is replaced atomically only after every file is in place.
+    """
+    version = time.strftime("%Y%m%d-%H%M%S")
+    base = os.path.join(root, ARTIFACTS_DIR, version)
+    suffix = 1
+    while os.path.exists(base):
+        base = os.path.join(root, ARTIFACTS_DIR, f"{version}-{suffix}")
+        suffix += 1
+    version = os.path.basename(base)
+    os.makedirs(base)
+    paths = _paths(base, version)
+
+    with open(paths["words"], "wb") as file:
+        pickle.dump(words, file)
+    with open(paths["classes"], "wb") as file:
+        pickle.dump(classes, file)
+    shutil.copyfile(model_h5, paths["model_h5"])
+    shutil.copyfile(model_npz, paths["model_npz"])
+    build_bundle(paths["bundle"], words, classes, model_npz, intents_path)
+    manifest = dict(manifest, version=version, vocabulary_size=len(words), class_count=len(classes))
+    with open(paths["manifest"], "w") as file:
+        json.dump(manifest, file, indent=2)
+
+    pointer = os.path.join(root, ARTIFACTS_DIR, POINTER_FILE)
+    with open(pointer + ".tmp", "w") as file:
+        file.write(version)
+    os.replace(pointer + ".tmp", pointer)
+    return paths
@@ -0,0 +1,117 @@
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+from numpy_model import NumpyIntentModel
+
+MAGIC = b"CHATBNDL"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+# magic, format version, header length
+PREAMBLE = struct.Struct("<8sIQ")
+
+
+def _align(n):
+    return (n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_bundle(path, words, classes, layers, intents, intents_mtime=None):
+    """Write vocabulary, classes, model weights and responses to one file.
+
+    Layout: a fixed preamble, a JSON header (words, classes, the response
+    table and each array's offset/shape), then the float32 little-endian
+    weight arrays, each 64-byte aligned so they can be memory-mapped in
+    place. `layers` is a list of (kernel, bias, activation). The file is
+    written next to `path` and renamed over it.
+    """
+    arrays = []
+    header_layers = []
+    for kernel, bias, activation in layers:
+        entry = {"activation": activation}
+        for name, array in (("kernel", kernel), ("bias", bias)):
+            array = np.ascontiguousarray(array, dtype="<f4")
+            entry[name] = {"shape": list(array.shape), "index": len(arrays)}
+            arrays.append(array)
+        header_layers.append(entry)
+
+    # Offsets are relative to the data section, which starts at the first
+    # aligned position after the header
+    offsets = []
+    position = 0
+    for array in arrays:
+        offsets.append(position)
+        position = _align(position + array.nbytes)
+
+    header = {
+        "words": list(words),
+        "classes": list(classes),
+        # patterns are only needed for training
+        "intents": {"intents": [{"tag": i["tag"], "responses": i["responses"]} for i in intents["intents"]]},
+        "intents_mtime": intents_mtime,
+        "layers": header_layers,
+        "offsets": offsets,
+    }
+    encoded = json.dumps(header).encode("utf-8")
+    data_start = _align(PREAMBLE.size + len(encoded))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+        file.write(encoded)
+        for offset, array in zip(offsets, arrays):
+            file.write(b"\0" * (data_start + offset - file.tell()))
+            file.write(array.tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+
+def build_bundle(path, words, classes, npz_path, intents_path="intents.json"):
+    """Bundle an exported .npz model with its vocabulary and intents.json"""
+    model = NumpyIntentModel.load(npz_path)
+    with open(intents_path) as file:
+        intents = json.load(file)
+    return write_bundle(path, words, classes, model.layers, intents, os.stat(intents_path).st_mtime)
+
+
+class IntentBundle:
+    """A loaded bundle. Weight arrays are read-only views of a memory map,
+    so loading does not copy them and forked workers share the same pages."""
+
+    def __init__(self, words, classes, model, intents, intents_mtime):
+        self.words = words
+        self.classes = classes
+        self.model = model
+        self.intents = intents
+        self.intents_mtime = intents_mtime
+
+
+def load_bundle(path):
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    magic, version, header_length = PREAMBLE.unpack(data[:PREAMBLE.size].tobytes())
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} intent bundle")
+    header = json.loads(data[PREAMBLE.size:PREAMBLE.size + header_length].tobytes())
+    data_start = _align(PREAMBLE.size + header_length)
+
+    def array(spec):
+        shape = spec["shape"]
+        offset = data_start + header["offsets"][spec["index"]]
+        count = int(np.prod(shape))
+        return data[offset:offset + count * 4].view("<f4").reshape(shape)
+
+    layers = [(array(layer["kernel"]), array(layer["bias"]), layer["activation"]) for layer in header["layers"]]
+    return IntentBundle(header["words"], header["classes"], NumpyIntentModel(layers),
+                        header["intents"], header["intents_mtime"])
+
+
+if __name__ == "__main__":
+    # Bundle the currently published artifacts (or the root files of an older checkout)
+    from intent_artifacts import current_artifacts, load_vocabulary
+
+    artifacts = current_artifacts()
+    out = sys.argv[1] if len(sys.argv) > 1 else artifacts["bundle"]
+    words, classes = load_vocabulary(artifacts)
+    print(f"Wrote {build_bundle(out, words, classes, artifacts['model_npz'])}")
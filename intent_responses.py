@@ -0,0 +1,95 @@
+import json
+import os
+import random
+import re
+import string
+import threading
+import time
+
+FALLBACK_TAG = "noanswer"
+
+# Prefixes that introduce the user's name, most specific first. The captured
+# name fills the {n} placeholder in responses.
+NAME_PATTERNS = [
+    re.compile(r"^\s*(?:hi|hello|hey)[\s,]+my name is\s+(?P<name>.+?)[\s.!]*$", re.IGNORECASE),
+    re.compile(r"^\s*my name is\s+(?P<name>.+?)[\s.!]*$", re.IGNORECASE),
+    re.compile(r"^\s*call me\s+(?P<name>.+?)[\s.!]*$", re.IGNORECASE),
+]
+
+
+def extract_name(message):
+    """The user's name if the message introduces it, else None"""
+    for pattern in NAME_PATTERNS:
+        match = pattern.match(message)
+        if match:
+            return match.group("name")
+    return None
+
+
+class IntentResponses:
+    """intents.json indexed by tag, with {n} templates compiled once.
+
+    The file is re-read when its modification time changes, checked at most
+    every `reload_interval` seconds, so edited responses go live without a
+    restart. `intents` (e.g. the table in an intent bundle) skips the initial
+    read; `mtime` is the file's modification time it was taken from.
+    """
+
+    def __init__(self, path="intents.json", reload_interval=2.0, intents=None, mtime=None):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = 0.0
+        self._templates = {}
+        if intents is None:
+            self.reload()
+        else:
+            self._index(intents, mtime)
+            self._checked_at = time.monotonic()
+
+    def reload(self):
+        """Re-read the intents file and rebuild the tag index"""
+        mtime = os.stat(self.path).st_mtime
+        with open(self.path) as file:
+            intents = json.load(file)
+        self._index(intents, mtime)
+
+    def _index(self, intents, mtime):
+        templates = {
+            intent["tag"]: [string.Template(r.replace("$", "$$").replace("{n}", "${n}")) for r in intent["responses"]]
+            for intent in intents["intents"]
+            if intent["responses"]
+        }
+        with self._lock:
+            self._templates = templates
+            self._mtime = mtime
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if self.path is None or now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            if os.stat(self.path).st_mtime != self._mtime:
+                self.reload()
+        except (OSError, ValueError) as e:
+            # Keep serving the last good index while the file is being edited
+            print(f"Error reloading {self.path}: {e}")
+
+    def __contains__(self, tag):
+        self._maybe_reload()
+        return tag in self._templates
+
+    def respond(self, tag, name=None):
+        """A random response for `tag`, falling back to the noanswer intent"""
+        self._maybe_reload()
+        templates = self._templates.get(tag) or self._templates.get(FALLBACK_TAG)
+        if not templates:
+            return None
+        return random.choice(templates).safe_substitute(n=name or "")
+
+    def respond_to(self, ints, message=""):
+        """Response for predict_class() output, with the user's name filled in"""
+        tag = ints[0]["intent"] if ints else FALLBACK_TAG
+        return self.respond(tag, extract_name(message))
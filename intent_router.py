@@ -0,0 +1,93 @@
+import os
+import pickle
+import threading
+import time
+
+import numpy as np
+
+from bow_encoder import BowEncoder, cache_stats, warm_up
+from intent_bundle import load_bundle
+from intent_responses import IntentResponses, extract_name
+from numpy_model import NumpyIntentModel
+
+
+class IntentRouter:
+    """Answers trivial chat messages from intents.json without calling the LLM.
+
+    The local intent classifier runs first. When its top intent is one of
+    `routable_tags` and its probability reaches `threshold`, a canned
+    response is returned; otherwise route() returns None and the caller
+    falls through to Gemini. Counters track how many LLM calls were avoided
+    and an estimate of the latency saved.
+    """
+
+    def __init__(self, encoder, model, classes, responses, threshold=0.9, routable_tags=None):
+        self.encoder = encoder
+        self.model = model
+        self.classes = classes
+        self.responses = responses
+        self.threshold = threshold
+        self.routable_tags = set(routable_tags) if routable_tags else None
+        self._lock = threading.Lock()
+        self._local = 0
+        self._local_time = 0.0
+        self._llm = 0
+        self._llm_time = 0.0
+
+    @classmethod
+    def load(cls, words_path="words.pkl", classes_path="classes.pkl", model_path="chatbot_model.npz",
+             intents_path="intents.json", **kwargs):
+        with open(classes_path, "rb") as file:
+            classes = pickle.load(file)
+        warm_up()
+        return cls(BowEncoder.from_pickle(words_path), NumpyIntentModel.load(model_path), classes,
+                   IntentResponses(intents_path), **kwargs)
+
+    @classmethod
+    def from_bundle(cls, path, intents_path="intents.json", **kwargs):
+        """Load from an intent bundle; edits to intents_path still hot-reload"""
+        bundle = load_bundle(path)
+        warm_up()
+        responses = IntentResponses(intents_path if os.path.exists(intents_path) else None,
+                                    intents=bundle.intents, mtime=bundle.intents_mtime)
+        return cls(BowEncoder(bundle.words), bundle.model, bundle.classes, responses, **kwargs)
+
+    def classify(self, message):
+        """Top (intent, probability) for a message"""
+        probabilities = self.model.predict(self.encoder.encode(message)[np.newaxis])[0]
+        best = int(probabilities.argmax())
+        return self.classes[best], float(probabilities[best])
+
+    def route(self, message):
+        """A canned response if the message is confidently trivial, else None"""
+        start = time.perf_counter()
+        tag, probability = self.classify(message)
+        response = None
+        routable = self.routable_tags is None or tag in self.routable_tags
+        if probability >= self.threshold and routable and tag in self.responses:
+            response = self.responses.respond(tag, extract_name(message))
+        if response is not None:
+            with self._lock:
+                self._local += 1
+                self._local_time += time.perf_counter() - start
+        return response
+
+    def record_llm_call(self, seconds):
+        """Record a message that went to the LLM and how long the call took"""
+        with self._lock:
+            self._llm += 1
+            self._llm_time += seconds
+
+    def stats(self):
+        with self._lock:
+            total = self._local + self._llm
+            mean_llm = self._llm_time / self._llm if self._llm else 0.0
+            return {
+                'answered_locally': self._local,
+                'sent_to_llm': self._llm,
+                'llm_calls_avoided_fraction': self._local / total if total else 0.0,
+                'mean_local_latency_ms': self._local_time / self._local * 1000 if self._local else 0.0,
+                'mean_llm_latency_ms': mean_llm * 1000,
+                'estimated_latency_saved_s': max(self._local * mean_llm - self._local_time, 0.0),
+                'text_cache': cache_stats(),
+            }
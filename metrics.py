@@ -0,0 +1,223 @@
+"""Per-request latency spans and Prometheus metrics.
+
+Each request records how long it spent in named spans (database queries,
+Gemini calls, text extraction, JSON encoding) on top of its total latency.
+Everything is exported in the Prometheus text format by `render()`, and a
+request slower than a threshold (SLOW_REQUEST_SECONDS in app.py) is logged
+with its span breakdown:
+
+    Slow request: POST /send-message 200 in 6.21s (gemini.chat 6.02s, db.chat_context 41ms, ...)
+
+Metrics are kept per process; with several workers each one reports its own.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; from cache hits and indexed queries up to long Gemini generations
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# Spans recorded outside a request (resume job workers) use this route label
+BACKGROUND_ROUTE = 'background'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_labels(self.labels, key)} {value}"
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels(self.labels, key, [('le', bound)])} {cumulative}"
+            yield f"{self.name}_bucket{_labels(self.labels, key, [('le', '+Inf')])} {values[-1]}"
+            yield f"{self.name}_sum{_labels(self.labels, key)} {values[-2]}"
+            yield f"{self.name}_count{_labels(self.labels, key)} {values[-1]}"
+
+
+REQUEST_SECONDS = Histogram(
+    'chatbot_request_seconds', 'Request latency, including streamed bodies', ('route', 'method', 'status'))
+SPAN_SECONDS = Histogram(
+    'chatbot_span_seconds', 'Time spent in database, Gemini, extraction and encoding spans', ('route', 'span'))
+GEMINI_TOKENS = Counter(
+    'chatbot_gemini_tokens_total', 'Gemini tokens reported in usage metadata', ('route', 'kind'))
+SLOW_REQUESTS = Counter(
+    'chatbot_slow_requests_total', 'Requests logged as slow', ('route',))
+
+_metrics = [REQUEST_SECONDS, SPAN_SECONDS, GEMINI_TOKENS, SLOW_REQUESTS]
+_stats_sources = []
+
+
+def register_stats(prefix, stats):
+    """Export the numeric values of `stats()` (a /stats style dict) as gauges"""
+    _stats_sources.append((prefix, stats))
+
+
+def _flatten(prefix, stats):
+    for key, value in stats.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            yield from _flatten(name, value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, value
+
+
+def render():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.collect())
+    for prefix, stats in _stats_sources:
+        try:
+            values = stats()
+        except Exception as e:
+            print(f"Error collecting {prefix} metrics: {e}")
+            continue
+        for name, value in _flatten(prefix, values or {}):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+class RequestTimings:
+    """Total and per-span time of one request"""
+
+    def __init__(self, route, method):
+        self.route = route
+        self.method = method
+        self.start = time.perf_counter()
+        self.spans = {}  # name -> [seconds, count]
+        # spans may be recorded from the resume worker pool
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            span = self.spans.setdefault(name, [0.0, 0])
+            span[0] += seconds
+            span[1] += 1
+
+    def breakdown(self):
+        with self._lock:
+            spans = sorted(self.spans.items(), key=lambda item: -item[1][0])
+        return ', '.join(
+            f"{name} {_format_seconds(seconds)}" + (f" x{count}" if count > 1 else '')
+            for name, (seconds, count) in spans
+        )
+
+
+def _format_seconds(seconds):
+    return f"{seconds:.2f}s" if seconds >= 1 else f"{seconds * 1000:.0f}ms"
+
+
+_current = contextvars.ContextVar('request_timings', default=None)
+
+
+def begin_request(route, method):
+    """Start timing a request; spans recorded in this context count towards it"""
+    timings = RequestTimings(route, method)
+    _current.set(timings)
+    return timings
+
+
+def end_request(timings, status, slow_after=0):
+    """Record a request's latency; log it if it took `slow_after` seconds or
+    more (0 never logs)"""
+    if _current.get() is timings:
+        _current.set(None)
+    elapsed = time.perf_counter() - timings.start
+    REQUEST_SECONDS.observe(elapsed, route=timings.route, method=timings.method, status=status)
+    if slow_after and elapsed >= slow_after:
+        SLOW_REQUESTS.inc(route=timings.route)
+        print(f"Slow request: {timings.method} {timings.route} {status} in {_format_seconds(elapsed)} "
+              f"({timings.breakdown() or 'no spans'})")
+
+
+def current_route():
+    timings = _current.get()
+    return timings.route if timings is not None else BACKGROUND_ROUTE
+
+
+def record_span(name, seconds):
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
+    SPAN_SECONDS.observe(seconds, route=current_route(), span=name)
+
+
+@contextmanager
+def span(name):
+    """Time the block as span `name` of the current request"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - start)
+
+
+def record_gemini_usage(response):
+    """Count the prompt and output tokens of a Gemini response, if reported"""
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is None:
+        return
+    route = current_route()
+    for kind, field in (('prompt', 'prompt_token_count'), ('output', 'candidates_token_count')):
+        count = getattr(usage, field, None)
+        if count:
+            GEMINI_TOKENS.inc(count, route=route, kind=kind)
@@ -0,0 +1,92 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 'inf')
+
+
+class MicroBatchPredictor:
+    """Coalesces concurrent predict() calls into batched forward passes.
+
+    Wraps any model with a Keras-style predict(batch). Rows submitted by
+    concurrent callers are gathered for up to `max_wait_ms` after the first
+    one arrives, or until `max_batch_size` rows are queued. A single
+    background thread then runs one forward pass and hands every caller its
+    own row of the output. The wrapper is itself a drop-in model.
+    """
+
+    def __init__(self, model, max_batch_size=32, max_wait_ms=2.0, wait_samples=1000):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._batch_sizes = dict.fromkeys(BATCH_SIZE_BUCKETS, 0)
+        self._waits = deque(maxlen=wait_samples)
+        self._wait_total = 0.0
+        self._thread = threading.Thread(target=self._run, name="intent-batcher", daemon=True)
+        self._thread.start()
+
+    def predict(self, x, verbose=0, timeout=None):
+        """Predict a (batch, features) array, sharing forward passes with other callers"""
+        futures = []
+        for row in np.asarray(x, dtype=np.float32):
+            future = Future()
+            self._queue.put((row, time.monotonic(), future))
+            futures.append(future)
+        return np.stack([f.result(timeout) for f in futures])
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            started = time.monotonic()
+            try:
+                outputs = self.model.predict(np.stack([row for row, _, _ in batch]), verbose=0)
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+            else:
+                for output, (_, _, future) in zip(outputs, batch):
+                    future.set_result(output)
+            self._record(len(batch), [started - enqueued for _, enqueued, _ in batch])
+
+    def _record(self, size, waits):
+        bucket = next((b for b in BATCH_SIZE_BUCKETS[:-1] if size <= b), 'inf')
+        with self._lock:
+            self._batches += 1
+            self._requests += size
+            self._batch_sizes[bucket] += 1
+            self._waits.extend(waits)
+            self._wait_total += sum(waits)
+
+    def stats(self):
+        """Batch-size distribution and queue-wait latency (ms) for tuning"""
+        with self._lock:
+            waits = sorted(self._waits)
+            stats = {
+                'batches': self._batches,
+                'requests': self._requests,
+                'mean_batch_size': self._requests / self._batches if self._batches else 0.0,
+                'batch_size_buckets': {f"le_{b}": n for b, n in self._batch_sizes.items()},
+                'queue_wait_ms_mean': self._wait_total / self._requests * 1000 if self._requests else 0.0,
+                'queue_depth': self._queue.qsize(),
+            }
+        for name, q in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99)):
+            stats[f"queue_wait_ms_{name}"] = waits[min(int(q * len(waits)), len(waits) - 1)] * 1000 if waits else 0.0
+        return stats
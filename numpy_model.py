@@ -0,0 +1,93 @@
+import sys
+
+import numpy as np
+
+
+def _relu(x):
+    return np.maximum(x, 0.0)
+
+
+def _softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+ACTIVATIONS = {
+    'relu': _relu,
+    'softmax': _softmax,
+    'sigmoid': _sigmoid,
+    'tanh': np.tanh,
+    'linear': lambda x: x,
+}
+
+
+def export_keras_model(h5_path="chatbot_model.h5", npz_path="chatbot_model.npz"):
+    """Write the Dense layers of a trained Keras model to a compact .npz file.
+
+    Dropout layers have no weights and are a no-op at inference time, so
+    they are skipped. Keras is only imported here, at export time.
+    """
+    from keras.models import load_model
+
+    model = load_model(h5_path)
+    arrays = {}
+    activations = []
+    for layer in model.layers:
+        weights = layer.get_weights()
+        if not weights:
+            continue
+        kernel, bias = weights
+        index = len(activations)
+        arrays[f"kernel_{index}"] = kernel.astype(np.float32)
+        arrays[f"bias_{index}"] = bias.astype(np.float32)
+        activations.append(layer.get_config()['activation'])
+    np.savez(npz_path, activations=np.array(activations), **arrays)
+    return npz_path
+
+
+class NumpyIntentModel:
+    """Pure-NumPy forward pass for the exported intent classifier.
+
+    Mirrors the part of the Keras API the chatbot uses: predict() takes a
+    (batch, vocabulary) array and returns (batch, classes) probabilities.
+    """
+
+    def __init__(self, layers):
+        for _, _, activation in layers:
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation: {activation}")
+        self.layers = layers
+
+    @classmethod
+    def load(cls, path="chatbot_model.npz"):
+        with np.load(path) as data:
+            activations = [str(a) for a in data['activations']]
+            layers = [
+                (data[f"kernel_{i}"], data[f"bias_{i}"], activation)
+                for i, activation in enumerate(activations)
+            ]
+        return cls(layers)
+
+    @property
+    def input_size(self):
+        return self.layers[0][0].shape[0]
+
+    @property
+    def output_size(self):
+        return self.layers[-1][0].shape[1]
+
+    def predict(self, x, verbose=0):
+        x = np.asarray(x, dtype=np.float32)
+        for kernel, bias, activation in self.layers:
+            x = ACTIVATIONS[activation](x @ kernel + bias)
+        return x
+
+
+if __name__ == "__main__":
+    h5_path = sys.argv[1] if len(sys.argv) > 1 else "chatbot_model.h5"
+    npz_path = sys.argv[2] if len(sys.argv) > 2 else "chatbot_model.npz"
+    print(f"Exported {export_keras_model(h5_path, npz_path)}")
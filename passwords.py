@@ -0,0 +1,88 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class PasswordHasherBusy(Exception):
+    """Too many hashes are queued already. Routes answer these with 503."""
+
+
+def hash_password(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def hash_method(password_hash):
+    """The method and cost a hash was made with, e.g. "scrypt:32768:8:1" """
+    return password_hash.split('$', 1)[0]
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords on a small, bounded thread pool.
+
+    `method` is a werkzeug method string such as "scrypt:32768:8:1" or
+    "pbkdf2:sha256:600000"; omitted costs take werkzeug's defaults. Hashing
+    releases the GIL, so `workers` threads use up to that many cores while
+    request threads wait. At most `max_pending` hashes are running or
+    queued; beyond that callers get PasswordHasherBusy right away instead
+    of piling up behind a login storm.
+    """
+
+    def __init__(self, method='scrypt', workers=2, max_pending=16):
+        # expand defaults, e.g. "scrypt" -> "scrypt:32768:8:1"
+        self.method = hash_method(hash_password('', method))
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(('hashed', 'verified', 'failed', 'rehashed', 'rejected'), 0)
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _submit(self, fn, *args):
+        if not self._pending.acquire(blocking=False):
+            self._count('rejected')
+            raise PasswordHasherBusy("Too many sign-ins in progress, please try again shortly")
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._pending.release()
+            raise
+        future.add_done_callback(lambda _: self._pending.release())
+        return future
+
+    def hash(self, password):
+        password_hash = self._submit(hash_password, password, self.method).result()
+        self._count('hashed')
+        return password_hash
+
+    def verify(self, password_hash, password):
+        ok = self._submit(check_password_hash, password_hash, password).result()
+        self._count('verified' if ok else 'failed')
+        return ok
+
+    def needs_rehash(self, password_hash):
+        """Whether a hash was made with a different method or cost"""
+        return hash_method(password_hash) != self.method
+
+    def rehash_later(self, password, store):
+        """Hash `password` with the current method in the background and pass
+        the result to `store`. Skipped when the pool is busy; the next
+        sign-in tries again."""
+        def rehash():
+            try:
+                store(hash_password(password, self.method))
+                self._count('rehashed')
+            except Exception as e:
+                print(f"Error upgrading password hash: {e}")
+
+        try:
+            self._submit(rehash)
+        except PasswordHasherBusy:
+            pass
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counts, method=self.method, workers=self.workers)
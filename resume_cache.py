@@ -0,0 +1,125 @@
+import hashlib
+import threading
+
+import mysql.connector
+
+SELECT_SQL = (
+    "SELECT analysis_result, score FROM resume_analysis_cache "
+    "WHERE cache_key = %s AND created_at > NOW() - INTERVAL %s SECOND"
+)
+TOUCH_SQL = "UPDATE resume_analysis_cache SET hits = hits + 1, last_used_at = CURRENT_TIMESTAMP WHERE cache_key = %s"
+UPSERT_SQL = (
+    "INSERT INTO resume_analysis_cache (cache_key, analysis_result, score) VALUES (%s, %s, %s) "
+    "ON DUPLICATE KEY UPDATE analysis_result = VALUES(analysis_result), score = VALUES(score), "
+    "created_at = CURRENT_TIMESTAMP, last_used_at = CURRENT_TIMESTAMP"
+)
+EXPIRE_SQL = "DELETE FROM resume_analysis_cache WHERE created_at < NOW() - INTERVAL %s SECOND"
+COUNT_SQL = "SELECT COUNT(*) FROM resume_analysis_cache"
+TRIM_SQL = "DELETE FROM resume_analysis_cache ORDER BY last_used_at ASC LIMIT %s"
+
+
+def cache_key(resume_text, job_description, prompt_version):
+    """Content address of an analysis: the extracted text, job and prompt version."""
+    digest = hashlib.sha256()
+    for part in (prompt_version, job_description or '', resume_text):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class ResumeAnalysisCache:
+    """Database cache of Gemini resume analyses keyed by content hash.
+
+    Entries older than `max_age` seconds are ignored and deleted, and the
+    table is trimmed to `max_entries` least recently used rows every
+    `evict_every` writes. Database errors are treated as cache misses.
+    """
+
+    def __init__(self, get_db, max_entries=10000, max_age=30 * 86400, evict_every=100):
+        self.get_db = get_db
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.evict_every = evict_every
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0, 'errors': 0}
+
+    def get(self, key):
+        """Return (analysis, score) for a cached key, or None."""
+        conn = self.get_db()
+        if not conn:
+            self._count('errors')
+            return None
+        try:
+            cursor = conn.cursor()
+            cursor.execute(SELECT_SQL, (key, self.max_age))
+            row = cursor.fetchone()
+            if row:
+                cursor.execute(TOUCH_SQL, (key,))
+                conn.commit()
+            cursor.close()
+        except mysql.connector.Error as err:
+            print(f"Resume cache error: {err}")
+            self._count('errors')
+            row = None
+        finally:
+            conn.close()
+        self._count('hits' if row else 'misses')
+        return (row[0], float(row[1])) if row else None
+
+    def put(self, key, analysis, score):
+        conn = self.get_db()
+        if not conn:
+            self._count('errors')
+            return
+        try:
+            cursor = conn.cursor()
+            cursor.execute(UPSERT_SQL, (key, analysis, score))
+            conn.commit()
+            cursor.close()
+        except mysql.connector.Error as err:
+            print(f"Resume cache error: {err}")
+            self._count('errors')
+            return
+        finally:
+            conn.close()
+        with self._lock:
+            self._stats['writes'] += 1
+            due = self._stats['writes'] % self.evict_every == 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then the least recently used beyond max_entries."""
+        conn = self.get_db()
+        if not conn:
+            return
+        try:
+            cursor = conn.cursor()
+            cursor.execute(EXPIRE_SQL, (self.max_age,))
+            removed = cursor.rowcount
+            cursor.execute(COUNT_SQL)
+            excess = cursor.fetchone()[0] - self.max_entries
+            if excess > 0:
+                cursor.execute(TRIM_SQL, (excess,))
+                removed += cursor.rowcount
+            conn.commit()
+            cursor.close()
+        except mysql.connector.Error as err:
+            print(f"Resume cache eviction error: {err}")
+            self._count('errors')
+            return
+        finally:
+            conn.close()
+        with self._lock:
+            self._stats['evictions'] += max(removed, 0)
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
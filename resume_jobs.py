@@ -0,0 +1,309 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resume_jobs (
+    id TEXT PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    job_description TEXT,
+    status TEXT NOT NULL DEFAULT 'queued',
+    total INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS resume_job_files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL REFERENCES resume_jobs(id) ON DELETE CASCADE,
+    filename TEXT NOT NULL,
+    original_filename TEXT NOT NULL,
+    content BLOB,
+    status TEXT NOT NULL DEFAULT 'pending',
+    result TEXT,
+    claimed_by TEXT,
+    lease_expires REAL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_resume_job_files_status ON resume_job_files (status, id);
+CREATE INDEX IF NOT EXISTS idx_resume_job_files_job ON resume_job_files (job_id);
+"""
+
+# Columns added after the first release; older databases get them on startup
+MIGRATIONS = {
+    'claimed_by': "ALTER TABLE resume_job_files ADD COLUMN claimed_by TEXT",
+    'lease_expires': "ALTER TABLE resume_job_files ADD COLUMN lease_expires REAL",
+}
+
+
+class ResumeJobQueue:
+    """Background resume-analysis queue persisted in a local SQLite database.
+
+    Uploaded files are stored in the database with the job, so queued work
+    survives a restart. Worker threads claim one file at a time under a
+    lease of `lease` seconds, which a heartbeat thread keeps extending while
+    the file is processed. Several processes can share the same database
+    file: a file whose lease ran out (its process died) is claimed again by
+    whichever worker asks next, and a worker that lost its lease throws its
+    result away instead of finishing the file twice.
+
+    `process_file(file, job)` receives dict rows and returns the result dict
+    for one file. `on_job_complete(job, files)` is called once every file of
+    a job has finished, by the worker that moved the job to 'completed'.
+    """
+
+    def __init__(self, db_path, process_file, on_job_complete=None, workers=2,
+                 poll_interval=1.0, retention=86400, lease=60):
+        self.db_path = db_path
+        self.process_file = process_file
+        self.on_job_complete = on_job_complete
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.lease = lease
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        # claim ids of the files this process is working on
+        self._claims = set()
+        self._claims_lock = threading.Lock()
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(resume_job_files)")}
+            for column, statement in MIGRATIONS.items():
+                if column not in columns:
+                    conn.execute(statement)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def start(self):
+        """Start the worker threads and the lease heartbeat.
+
+        Work interrupted elsewhere is not requeued here; it is claimed again
+        once its lease expires, so starting one process never takes over
+        files another live process is working on.
+        """
+        if self._threads:
+            return
+        self.purge_expired()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"resume-job-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        threading.Thread(target=self._heartbeat, name="resume-job-heartbeat", daemon=True).start()
+
+    def stop(self, timeout=None):
+        """Stop claiming files and wait up to `timeout` seconds for the files
+        in progress; anything unfinished is claimed again once its lease
+        expires."""
+        self._stopping.set()
+        self._wakeup.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+
+    def submit(self, user_id, job_description, files):
+        """Queue a job for `files`, a list of (filename, original_filename, bytes)."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT INTO resume_jobs (id, user_id, job_description, total, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, user_id, job_description, len(files), now, now)
+            )
+            conn.executemany(
+                "INSERT INTO resume_job_files (job_id, filename, original_filename, content, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(job_id, filename, original_filename, content, now) for filename, original_filename, content in files]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        self._wakeup.set()
+        return job_id
+
+    def get_job(self, job_id, user_id):
+        """Job status with per-file progress, or None if the user has no such job."""
+        conn = self._connect()
+        try:
+            job = conn.execute(
+                "SELECT id, status, total, created_at, updated_at FROM resume_jobs WHERE id = ? AND user_id = ?",
+                (job_id, user_id)
+            ).fetchone()
+            if job is None:
+                return None
+            files = conn.execute(
+                "SELECT original_filename, status, result FROM resume_job_files WHERE job_id = ? ORDER BY id",
+                (job_id,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return {
+            "job_id": job['id'],
+            "status": job['status'],
+            "total": job['total'],
+            "completed": sum(1 for f in files if f['status'] == 'done'),
+            "files": [
+                {
+                    "filename": f['original_filename'],
+                    "status": f['status'],
+                    "result": json.loads(f['result']) if f['result'] else None
+                }
+                for f in files
+            ]
+        }
+
+    def purge_expired(self):
+        """Delete finished jobs older than the retention period."""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "DELETE FROM resume_jobs WHERE status = 'completed' AND updated_at < ?",
+                (time.time() - self.retention,)
+            )
+
+    def _claim(self):
+        """Claim the oldest pending file, or a running one whose lease expired"""
+        now = time.time()
+        claim = None
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT f.id, f.job_id, f.filename, f.original_filename, f.content, j.user_id, j.job_description "
+                "FROM resume_job_files f JOIN resume_jobs j ON j.id = f.job_id "
+                "WHERE f.status = 'pending' OR (f.status = 'running' AND COALESCE(f.lease_expires, 0) < ?) "
+                "ORDER BY f.id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is not None:
+                claim = uuid.uuid4().hex
+                conn.execute(
+                    "UPDATE resume_job_files SET status = 'running', claimed_by = ?, lease_expires = ?, updated_at = ? WHERE id = ?",
+                    (claim, now + self.lease, now, row['id'])
+                )
+                conn.execute(
+                    "UPDATE resume_jobs SET status = 'running', updated_at = ? WHERE id = ? AND status = 'queued'",
+                    (now, row['job_id'])
+                )
+                with self._claims_lock:
+                    self._claims.add(claim)
+            conn.execute("COMMIT")
+            return dict(row, claim=claim) if row is not None else None
+        except Exception:
+            if claim is not None:
+                with self._claims_lock:
+                    self._claims.discard(claim)
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _heartbeat(self):
+        """Extend the leases of files in progress every third of a lease"""
+        while True:
+            time.sleep(self.lease / 3)
+            with self._claims_lock:
+                claims = list(self._claims)
+            if not claims:
+                if self._stopping.is_set():
+                    return
+                continue
+            try:
+                with closing(self._connect()) as conn:
+                    conn.executemany(
+                        "UPDATE resume_job_files SET lease_expires = ? WHERE claimed_by = ? AND status = 'running'",
+                        [(time.time() + self.lease, claim) for claim in claims]
+                    )
+            except sqlite3.Error as e:
+                print(f"Resume job heartbeat error: {e}")
+
+    def _finish(self, file, result):
+        """Store a file's result; returns the finished job's files if it was the last one.
+
+        Nothing is stored if the file's lease was lost to another worker, and
+        only the worker whose update moves the job to 'completed' gets the
+        files back, so on_job_complete runs at most once per job.
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            stored = conn.execute(
+                "UPDATE resume_job_files SET status = 'done', result = ?, content = NULL, claimed_by = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE id = ? AND status = 'running' AND claimed_by = ?",
+                (json.dumps(result), now, file['id'], file['claim'])
+            ).rowcount
+            if not stored:
+                conn.execute("COMMIT")
+                print(f"Resume job {file['job_id']}: lease on {file['original_filename']} expired, result dropped")
+                return None
+            remaining = conn.execute(
+                "SELECT COUNT(*) FROM resume_job_files WHERE job_id = ? AND status != 'done'",
+                (file['job_id'],)
+            ).fetchone()[0]
+            finished = None
+            completed = remaining == 0 and conn.execute(
+                "UPDATE resume_jobs SET status = 'completed', updated_at = ? WHERE id = ? AND status = 'running'",
+                (now, file['job_id'])
+            ).rowcount == 1
+            if completed:
+                finished = [
+                    {"filename": row['filename'], "result": json.loads(row['result'])}
+                    for row in conn.execute(
+                        "SELECT filename, result FROM resume_job_files WHERE job_id = ? ORDER BY id",
+                        (file['job_id'],)
+                    )
+                ]
+            conn.execute("COMMIT")
+            return finished
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                file = self._claim()
+            except sqlite3.Error as e:
+                print(f"Resume job queue error: {e}")
+                file = None
+            if file is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            job = {"id": file['job_id'], "user_id": file['user_id'], "job_description": file['job_description']}
+            try:
+                result = self.process_file(file, job)
+            except Exception as e:
+                result = {"filename": file['original_filename'], "error": f"Analysis error: {str(e)}"}
+
+            try:
+                finished = self._finish(file, result)
+            except Exception as e:
+                print(f"Error completing resume job {file['job_id']}: {e}")
+                continue
+            finally:
+                with self._claims_lock:
+                    self._claims.discard(file['claim'])
+
+            try:
+                if finished is not None:
+                    if self.on_job_complete:
+                        self.on_job_complete(job, finished)
+                    self.purge_expired()
+            except Exception as e:
+                print(f"Error completing resume job {file['job_id']}: {e}")
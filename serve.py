@@ -0,0 +1,99 @@
+"""Production entry point: a pre-forking gunicorn server for app.py.
+
+The app is imported once in the master process, together with the Gemini
+model wrapper, the intent router artifacts and the answer cache, and the
+workers are forked from it so they share that state copy-on-write. Each
+worker runs WEB_THREADS threads. On SIGTERM the workers report not ready,
+stop taking queued resume jobs, and are given WEB_GRACEFUL_TIMEOUT seconds
+to finish in-flight generations before they exit.
+
+    python serve.py
+"""
+import multiprocessing
+import os
+import signal
+
+from gunicorn.app.base import BaseApplication
+
+# Background threads do not survive fork(); start them in each worker
+os.environ['DEFER_BACKGROUND_WORKERS'] = '1'
+
+
+def default_workers():
+    # Requests mostly wait on Gemini and MySQL, so threads carry the
+    # concurrency and a few processes use the cores
+    return min(multiprocessing.cpu_count() * 2, 8)
+
+
+class ChatbotServer(BaseApplication):
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        import app
+
+        # Create the shared state before forking. Creating the Gemini model
+        # does not open a connection, so it is safe to share.
+        app.get_genai_model()
+        app.get_intent_router()
+        app.get_answer_cache()
+        return app.app
+
+
+def post_fork(server, worker):
+    import app
+    # Every worker runs its own resume job threads; claims are leased, so a
+    # new or restarted worker only takes over files whose owner stopped
+    # renewing them
+    app.start_background_workers()
+
+
+def post_worker_init(worker):
+    import app
+
+    # gunicorn's own SIGTERM handler stops accepting connections and lets
+    # in-flight requests finish; report not ready first
+    graceful_exit = signal.getsignal(signal.SIGTERM)
+
+    def drain(signum, frame):
+        app.start_draining()
+        graceful_exit(signum, frame)
+
+    signal.signal(signal.SIGTERM, drain)
+
+
+def worker_exit(server, worker):
+    import app
+    app.resume_jobs.stop(timeout=5)
+    app.db_pool.close_idle()
+
+
+def options():
+    host = os.environ.get('HOST', '0.0.0.0')
+    port = int(os.environ.get('PORT', 5000))
+    return {
+        'bind': os.environ.get('WEB_BIND', f"{host}:{port}"),
+        'workers': int(os.environ.get('WEB_WORKERS', default_workers())),
+        'threads': int(os.environ.get('WEB_THREADS', 8)),
+        'worker_class': 'gthread',
+        'preload_app': True,
+        # Seconds a worker may stay silent before the master restarts it
+        'timeout': int(os.environ.get('WEB_TIMEOUT', 120)),
+        # Seconds in-flight requests get to finish after SIGTERM; covers a
+        # Gemini call with retries (GEMINI_DEADLINE)
+        'graceful_timeout': int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 90)),
+        'keepalive': int(os.environ.get('WEB_KEEPALIVE', 5)),
+        'accesslog': os.environ.get('WEB_ACCESS_LOG', '-'),
+        'post_fork': post_fork,
+        'post_worker_init': post_worker_init,
+        'worker_exit': worker_exit,
+    }
+
+
+if __name__ == "__main__":
+    ChatbotServer(options()).run()
@@ -38,7 +38,8 @@ def setup_database():
                 user_id INT NOT NULL,
                 title VARCHAR(255) DEFAULT 'New Chat',
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+                INDEX idx_conversations_user_created (user_id, created_at, id, title)
             )
         """)
         print("✓ Table 'conversations' created or already exists.")
@@ -51,7 +52,8 @@ def setup_database():
                 sender ENUM('user', 'bot') NOT NULL,
                 content TEXT NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (conversation_id) REFERENCES conversations(id) ON DELETE CASCADE
+                FOREIGN KEY (conversation_id) REFERENCES conversations(id) ON DELETE CASCADE,
+                INDEX idx_messages_conversation_created (conversation_id, created_at, id)
             )
         """)
         print("✓ Table 'messages' created or already exists.")
@@ -72,6 +74,20 @@ def setup_database():
         """)
         print("✓ Table 'resumes' created or already exists.")
 
+        # Create resume analysis cache table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS resume_analysis_cache (
+                cache_key CHAR(64) PRIMARY KEY,
+                analysis_result TEXT NOT NULL,
+                score FLOAT NOT NULL,
+                hits INT NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_resume_cache_last_used (last_used_at)
+            )
+        """)
+        print("✓ Table 'resume_analysis_cache' created or already exists.")
+
         conn.commit()
         cursor.close()
         conn.close()
@@ -0,0 +1,160 @@
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import PyPDF2
+import docx
+
+# Caps so a pathological upload cannot monopolize CPU or memory
+PDF_MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', 50))
+RESUME_MAX_CHARS = int(os.environ.get('RESUME_MAX_CHARS', 100000))
+
+# PDFs with at least this many pages are split across worker processes
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get('PDF_PARALLEL_MIN_PAGES', 16))
+PDF_EXTRACT_PROCESSES = int(os.environ.get('PDF_EXTRACT_PROCESSES', min(4, os.cpu_count() or 1)))
+
+_pdf_executor = None
+_pdf_executor_lock = threading.Lock()
+_pdf_workers_enabled = False
+
+
+def start_pdf_workers():
+    """Fork the page-extraction process pool while the caller is single-threaded.
+
+    Forking from a busy server could copy a lock held by another thread
+    into the child and deadlock it, so the pool is only ever started here,
+    before any request or background thread exists. Spawned or forkserver
+    workers would re-import the web app as __main__, so only fork is used.
+    The one exception is a pool broken by a crashed worker, which is
+    replaced on the next large PDF rather than disabling parallel
+    extraction until a restart.
+    """
+    global _pdf_workers_enabled
+    if PDF_EXTRACT_PROCESSES < 2 or 'fork' not in multiprocessing.get_all_start_methods():
+        return
+    _pdf_workers_enabled = True
+    _get_pdf_executor()
+
+
+def _get_pdf_executor():
+    """The page-extraction process pool, or None if start_pdf_workers() did not enable one."""
+    global _pdf_executor
+    if not _pdf_workers_enabled:
+        return None
+    with _pdf_executor_lock:
+        if _pdf_executor is None:
+            executor = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACT_PROCESSES,
+                mp_context=multiprocessing.get_context('fork')
+            )
+            # a fork pool starts all of its processes on the first submit
+            executor.submit(int).result()
+            _pdf_executor = executor
+        return _pdf_executor
+
+
+def _drop_pdf_executor(executor):
+    """Forget a broken pool so the next call starts a new one"""
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is executor:
+            _pdf_executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_pages_parallel(executor, data, page_count, max_chars):
+    chunk = -(-page_count // PDF_EXTRACT_PROCESSES)
+    futures = [
+        executor.submit(_extract_page_range, data, start, min(start + chunk, page_count), max_chars)
+        for start in range(0, page_count, chunk)
+    ]
+    parts = []
+    total = 0
+    for future in futures:
+        chunk_parts = future.result()
+        parts.extend(chunk_parts)
+        total += sum(len(text) for text in chunk_parts)
+        if total >= max_chars:
+            for pending in futures:
+                pending.cancel()
+            break
+    return parts
+
+
+def _read_bytes(source):
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if isinstance(source, str):
+        with open(source, 'rb') as file:
+            return file.read()
+    return source.read()
+
+
+def _extract_pages(reader, start, stop, max_chars):
+    """Collect page texts in order until `max_chars` have been gathered."""
+    parts = []
+    total = 0
+    for index in range(start, stop):
+        text = reader.pages[index].extract_text() or ''
+        parts.append(text)
+        total += len(text)
+        if total >= max_chars:
+            break
+    return parts
+
+
+def _extract_page_range(data, start, stop, max_chars):
+    """Worker-process entry point: extract pages [start, stop) of a PDF."""
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return _extract_pages(reader, start, stop, max_chars)
+
+
+def extract_text_from_pdf(source, max_pages=None, max_chars=None):
+    """Extract text from a PDF given as a path, bytes or binary stream.
+
+    Only the first `max_pages` pages are read and the result is cut to
+    `max_chars`. Pages are joined once at the end, and large documents are
+    split into page ranges extracted in parallel worker processes.
+    """
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    max_chars = RESUME_MAX_CHARS if max_chars is None else max_chars
+    try:
+        data = _read_bytes(source)
+        reader = PyPDF2.PdfReader(io.BytesIO(data))
+        page_count = min(len(reader.pages), max_pages)
+
+        executor = _get_pdf_executor() if page_count >= PDF_PARALLEL_MIN_PAGES else None
+        parts = None
+        if executor is not None:
+            try:
+                parts = _extract_pages_parallel(executor, data, page_count, max_chars)
+            except BrokenProcessPool as e:
+                print(f"PDF extraction worker died, restarting the pool: {e}")
+                _drop_pdf_executor(executor)
+        if parts is None:
+            parts = _extract_pages(reader, 0, page_count, max_chars)
+        return ''.join(parts)[:max_chars]
+    except Exception as e:
+        print(f"Error reading PDF: {e}")
+        return ""
+
+
+def extract_text_from_docx(source, max_chars=None):
+    """Extract text from a DOCX given as a path or binary stream"""
+    max_chars = RESUME_MAX_CHARS if max_chars is None else max_chars
+    try:
+        doc = docx.Document(source)
+        parts = []
+        total = 0
+        for para in doc.paragraphs:
+            parts.append(para.text)
+            total += len(para.text) + 1
+            if total >= max_chars:
+                break
+        return '\n'.join(parts)[:max_chars]
+    except Exception as e:
+        print(f"Error reading DOCX: {e}")
+        return ""
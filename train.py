@@ -1,21 +1,43 @@
 # libraries
-import random
 import numpy as np
-import pickle
-import json
-from flask import Flask, render_template, request
+import os
+from flask import Flask, render_template, request, jsonify
 from flask_ngrok import run_with_ngrok
-import nltk
-from keras.models import load_model
-from nltk.stem import WordNetLemmatizer
-lemmatizer = WordNetLemmatizer()
+from bow_encoder import BowEncoder, cache_stats, warm_up
+from numpy_model import NumpyIntentModel
+from micro_batcher import MicroBatchPredictor
+from intent_responses import IntentResponses
+from intent_artifacts import current_artifacts, load_vocabulary
+from intent_bundle import load_bundle
 
 
 # chat initialization
-model = load_model("chatbot_model.h5")
-intents = json.loads(open("intents.json").read())
-words = pickle.load(open("words.pkl", "rb"))
-classes = pickle.load(open("classes.pkl", "rb"))
+# words, classes and weights of the currently published training run
+artifacts = current_artifacts()
+if os.path.exists(artifacts["bundle"]):
+    # one memory-mapped file: vocabulary, classes, weights and responses,
+    # with no pickle to unpickle and no weight copies per worker
+    bundle = load_bundle(artifacts["bundle"])
+    model = bundle.model
+    words, classes = bundle.words, bundle.classes
+    # tag-indexed responses, reloaded when intents.json changes
+    intents = IntentResponses("intents.json" if os.path.exists("intents.json") else None,
+                              intents=bundle.intents, mtime=bundle.intents_mtime)
+else:
+    # weights exported from chatbot_model.h5 (see numpy_model.py); Keras is only
+    # needed to train
+    model = NumpyIntentModel.load(artifacts["model_npz"])
+    words, classes = load_vocabulary(artifacts)
+    intents = IntentResponses("intents.json")
+# concurrent /get requests share batched forward passes
+model = MicroBatchPredictor(
+    model,
+    max_batch_size=int(os.environ.get("INTENT_MAX_BATCH", 32)),
+    max_wait_ms=float(os.environ.get("INTENT_BATCH_WINDOW_MS", 2)),
+)
+encoder = BowEncoder(words)
+# load the tokenizer and WordNet before the first request
+warm_up()
 
 app = Flask(__name__)
 
@@ -27,51 +49,23 @@ def home():
 @app.route("/get", methods=["POST"])
 def chatbot_response():
     msg = request.form["msg"]
-    #checks is a user has given a name, in order to give a personalized feedback
-    if msg.startswith('my name is'):
-        name = msg[11:]
-        ints = predict_class(msg, model)
-        res1 = getResponse(ints, intents)
-        res =res1.replace("{n}",name)
-    elif msg.startswith('hi my name is'):
-        name = msg[14:]
-        ints = predict_class(msg, model)
-        res1 = getResponse(ints, intents)
-        res =res1.replace("{n}",name)
-    #if no name is passed execute normally
-    else:
-        ints = predict_class(msg, model)
-        res = getResponse(ints, intents)
-    return res
+    ints = predict_class(msg, model)
+    # a name given by the user ("my name is ...") fills {n} for a personalized reply
+    return getResponse(ints, intents, msg)
 
 
-# chat functionalities
-def clean_up_sentence(sentence):
-    sentence_words = nltk.word_tokenize(sentence)
-    sentence_words = [lemmatizer.lemmatize(word.lower()) for word in sentence_words]
-    return sentence_words
-
-
-# return bag of words array: 0 or 1 for each word in the bag that exists in the sentence
-def bow(sentence, words, show_details=True):
-    # tokenize the pattern
-    sentence_words = clean_up_sentence(sentence)
-    # bag of words - matrix of N words, vocabulary matrix
-    bag = [0] * len(words)
-    for s in sentence_words:
-        for i, w in enumerate(words):
-            if w == s:
-                # assign 1 if current word is in the vocabulary position
-                bag[i] = 1
-                if show_details:
-                    print("found in bag: %s" % w)
-    return np.array(bag)
+@app.route("/stats")
+def stats():
+    # batch size and queue wait metrics for tuning the batching window, plus
+    # lemma/sentence cache hit rates
+    return jsonify(dict(model.stats(), text_cache=cache_stats()))
 
 
+# chat functionalities
 def predict_class(sentence, model):
     # filter out predictions below a threshold
-    p = bow(sentence, words, show_details=False)
-    res = model.predict(np.array([p]))[0]
+    p = encoder.encode(sentence)
+    res = model.predict(p[np.newaxis])[0]
     ERROR_THRESHOLD = 0.25
     results = [[i, r] for i, r in enumerate(res) if r > ERROR_THRESHOLD]
     # sort by strength of probability
@@ -82,14 +76,9 @@ def predict_class(sentence, model):
     return return_list
 
 
-def getResponse(ints, intents_json):
-    tag = ints[0]["intent"]
-    list_of_intents = intents_json["intents"]
-    for i in list_of_intents:
-        if i["tag"] == tag:
-            result = random.choice(i["responses"])
-            break
-    return result
+def getResponse(ints, intents, msg=""):
+    # falls back to the noanswer intent when nothing passed the threshold
+    return intents.respond_to(ints, msg)
 
 
 if __name__ == "__main__":
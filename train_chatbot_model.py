@@ -1,83 +1,204 @@
+import argparse
+import hashlib
 import json
-import pickle
+import os
+import tempfile
+import time
 import numpy as np
 import nltk
 nltk.data.path.append(r"C:\Users\hp\AppData\Roaming\nltk_data")
-from nltk.stem import WordNetLemmatizer
-from keras.models import Sequential
+from keras.models import Sequential, load_model
 from keras.layers import Dense, Dropout
 from keras.optimizers import Adam
-import random
+from keras.callbacks import EarlyStopping
+from bow_encoder import BowEncoder, cache_stats, lemmatize
+from numpy_model import export_keras_model
+from intent_artifacts import ARTIFACTS_DIR, current_artifacts, load_manifest, load_vocabulary, publish_artifacts
 
-# Initialize lemmatizer
-lemmatizer = WordNetLemmatizer()
+TOKEN_CACHE_PATH = os.path.join(ARTIFACTS_DIR, "token_cache.json")
 
-# Load intents
-with open("intents.json") as file:
-    intents = json.load(file)
-
-words = []
-classes = []
-documents = []
 ignore_letters = ['?', '!', '.', ',']
 
-# Process intents
-for intent in intents['intents']:
-    for pattern in intent['patterns']:
-        word_list = nltk.word_tokenize(pattern)
-        words.extend(word_list)
-        documents.append((word_list, intent['tag']))
-        if intent['tag'] not in classes:
-            classes.append(intent['tag'])
-
-# Lemmatize and lower
-words = [lemmatizer.lemmatize(w.lower()) for w in words if w not in ignore_letters]
-words = sorted(list(set(words)))
-classes = sorted(list(set(classes)))
-
-# Save words and classes
-pickle.dump(words, open("words.pkl", "wb"))
-pickle.dump(classes, open("classes.pkl", "wb"))
-
-# Create training data
-training = []
-output_empty = [0] * len(classes)
-
-for document in documents:
-    bag = []
-    word_patterns = document[0]
-    word_patterns = [lemmatizer.lemmatize(word.lower()) for word in word_patterns]
-    for w in words:
-        bag.append(1) if w in word_patterns else bag.append(0)
-
-    output_row = list(output_empty)
-    output_row[classes.index(document[1])] = 1
-
-    training.append([bag, output_row])
-
-# Shuffle
-random.shuffle(training)
-training = np.array(training, dtype=object)
-
-X_train = np.array(list(training[:, 0]))
-y_train = np.array(list(training[:, 1]))
-
-# Build model
-model = Sequential()
-model.add(Dense(128, input_shape=(len(X_train[0]),), activation='relu'))
-model.add(Dropout(0.5))
-model.add(Dense(64, activation='relu'))
-model.add(Dropout(0.5))
-model.add(Dense(len(y_train[0]), activation='softmax'))
-
-# Compile
-adam = Adam(learning_rate=0.01)
-model.compile(loss='categorical_crossentropy', optimizer=adam, metrics=['accuracy'])
-
-# Train model
-hist = model.fit(X_train, y_train, epochs=200, batch_size=5, verbose=1)
-
-# Save model
-model.save("chatbot_model.h5")
-
-print("Model created and saved as chatbot_model.h5")
+
+def load_token_cache():
+    try:
+        with open(TOKEN_CACHE_PATH) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_token_cache(cache):
+    os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+    with open(TOKEN_CACHE_PATH + ".tmp", "w") as file:
+        json.dump(cache, file)
+    os.replace(TOKEN_CACHE_PATH + ".tmp", TOKEN_CACHE_PATH)
+
+
+def tokenize_patterns(intents, cache):
+    """Tokenize and lemmatize every pattern, reusing cached results by content hash.
+
+    Returns (documents, words, classes, cache_hits) where documents are
+    (lemmas, tag) pairs and words/classes are in first-seen order.
+    """
+    documents = []
+    words = []
+    classes = []
+    hits = 0
+    for intent in intents['intents']:
+        for pattern in intent['patterns']:
+            key = hashlib.sha256(pattern.encode("utf-8")).hexdigest()
+            entry = cache.get(key)
+            if entry is None:
+                word_list = nltk.word_tokenize(pattern)
+                entry = {"tokens": word_list, "lemmas": [lemmatize(w) for w in word_list]}
+                cache[key] = entry
+            else:
+                hits += 1
+            # Lemmatize and lower
+            words.extend(lemma for token, lemma in zip(entry["tokens"], entry["lemmas"]) if token not in ignore_letters)
+            documents.append((entry["lemmas"], intent['tag']))
+            if intent['tag'] not in classes:
+                classes.append(intent['tag'])
+    return documents, words, classes, hits
+
+
+def build_model(input_size, output_size):
+    model = Sequential()
+    model.add(Dense(128, input_shape=(input_size,), activation='relu'))
+    model.add(Dropout(0.5))
+    model.add(Dense(64, activation='relu'))
+    model.add(Dropout(0.5))
+    model.add(Dense(output_size, activation='softmax'))
+    return model
+
+
+def warm_start(model, previous):
+    """Copy a previous model's weights into a model with a grown vocabulary/class list.
+
+    New words and classes are appended after the existing ones, so the old
+    weights map onto the leading rows (input) and columns (output); the new
+    ones keep their fresh initialization.
+    """
+    dense_layers = [layer for layer in model.layers if layer.get_weights()]
+    previous_layers = [layer for layer in previous.layers if layer.get_weights()]
+    for layer, old_layer in zip(dense_layers, previous_layers):
+        kernel, bias = layer.get_weights()
+        old_kernel, old_bias = old_layer.get_weights()
+        kernel[:old_kernel.shape[0], :old_kernel.shape[1]] = old_kernel
+        bias[:old_bias.shape[0]] = old_bias
+        layer.set_weights([kernel, bias])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the intent classifier from intents.json")
+    parser.add_argument("--incremental", action="store_true",
+                        help="extend the current vocabulary/classes and warm-start from the current model")
+    parser.add_argument("--epochs", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="default: 5 for full training, 32 for incremental")
+    parser.add_argument("--patience", type=int, default=5, help="early stopping patience (incremental only)")
+    parser.add_argument("--warm-epochs", type=int, default=40,
+                        help="at most this many epochs when warm-starting (incremental only)")
+    args = parser.parse_args()
+    started = time.perf_counter()
+
+    # Load intents
+    with open("intents.json", "rb") as file:
+        raw_intents = file.read()
+    intents = json.loads(raw_intents)
+
+    # Process intents, reusing cached tokenization
+    cache = load_token_cache()
+    documents, words, classes, cache_hits = tokenize_patterns(intents, cache)
+    save_token_cache(cache)
+    lemma_stats = cache_stats()["lemma"]
+    print(f"Tokenized {len(documents)} patterns ({cache_hits} from cache, "
+          f"lemma cache hit rate {lemma_stats['hit_rate']:.0%})")
+
+    new_words = sorted(set(words))
+    new_classes = sorted(set(classes))
+
+    previous_paths = current_artifacts()
+    previous_manifest = load_manifest(previous_paths) or {}
+    previous = None
+    if args.incremental and os.path.exists(previous_paths["model_h5"]):
+        old_words, old_classes = load_vocabulary(previous_paths)
+        if set(old_classes) <= set(new_classes):
+            # Keep existing indices stable and append anything new
+            words = old_words + sorted(set(new_words) - set(old_words))
+            classes = old_classes + sorted(set(new_classes) - set(old_classes))
+            previous = load_model(previous_paths["model_h5"])
+            print(f"Incremental: +{len(words) - len(old_words)} words, +{len(classes) - len(old_classes)} classes "
+                  f"on top of version {previous_paths['version'] or 'legacy'}")
+        else:
+            print("Incremental: intents were removed, falling back to full training")
+    if previous is None:
+        words = new_words
+        classes = new_classes
+
+    # Create training data: one bag-of-words row and one-hot class row per document
+    encoder = BowEncoder(words)
+    class_index = {c: i for i, c in enumerate(classes)}
+
+    X_train = encoder.encode_tokens_batch([document[0] for document in documents])
+    y_train = np.zeros((len(documents), len(classes)), dtype=np.float32)
+    y_train[np.arange(len(documents)), [class_index[document[1]] for document in documents]] = 1.0
+
+    # Shuffle
+    order = np.random.permutation(len(documents))
+    X_train = X_train[order]
+    y_train = y_train[order]
+
+    # Build model
+    model = build_model(len(words), len(classes))
+    callbacks = []
+    if previous is not None:
+        warm_start(model, previous)
+        # Dropout keeps the training loss noisy, so it never stops improving
+        # by a fixed delta; accuracy plateaus once every pattern is classified
+        # correctly, which is as far as a warm start needs to go
+        callbacks.append(EarlyStopping(monitor='accuracy', mode='max', patience=args.patience,
+                                       restore_best_weights=True))
+        epochs = min(args.epochs, args.warm_epochs)
+        batch_size = args.batch_size or 32
+    else:
+        epochs = args.epochs
+        batch_size = args.batch_size or 5
+
+    # Compile
+    adam = Adam(learning_rate=0.01)
+    model.compile(loss='categorical_crossentropy', optimizer=adam, metrics=['accuracy'])
+
+    # Train model
+    hist = model.fit(X_train, y_train, epochs=epochs, batch_size=batch_size, callbacks=callbacks, verbose=1)
+    elapsed = time.perf_counter() - started
+
+    # Save model, export the weights for the Keras-free NumPy serving path and
+    # publish words, classes, weights and the serving bundle as one version
+    with tempfile.TemporaryDirectory() as tmp:
+        h5_path = os.path.join(tmp, "chatbot_model.h5")
+        npz_path = os.path.join(tmp, "chatbot_model.npz")
+        model.save(h5_path)
+        export_keras_model(h5_path, npz_path)
+        full_seconds = previous_manifest.get("full_training_seconds") if previous is not None else elapsed
+        paths = publish_artifacts(words, classes, h5_path, npz_path, {
+            "mode": "incremental" if previous is not None else "full",
+            "parent_version": previous_paths["version"] if previous is not None else None,
+            "intents_sha256": hashlib.sha256(raw_intents).hexdigest(),
+            "epochs_run": len(hist.history['loss']),
+            "batch_size": batch_size,
+            "training_seconds": round(elapsed, 2),
+            "full_training_seconds": round(full_seconds, 2) if full_seconds else None,
+        })
+
+    print(f"Model created and published as version {paths['version']} in {paths['dir']}")
+    if previous is not None and full_seconds:
+        print(f"Incremental training took {elapsed:.1f}s vs {full_seconds:.1f}s for the last full training "
+              f"({full_seconds - elapsed:.1f}s saved)")
+    else:
+        print(f"Full training took {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -34,6 +34,35 @@ def update_database():
             else:
                 print(f"⚠️  Error adding job_description: {e}")
 
+        print("Adding pagination indexes...")
+        indexes = [
+            ("idx_conversations_user_created", "conversations", "(user_id, created_at, id, title)"),
+            ("idx_messages_conversation_created", "messages", "(conversation_id, created_at, id)"),
+        ]
+        for name, table, columns in indexes:
+            try:
+                cursor.execute(f"CREATE INDEX {name} ON {table} {columns}")
+                print(f"✓ Added '{name}' index")
+            except mysql.connector.Error as e:
+                if "Duplicate key name" in str(e):
+                    print(f"✓ '{name}' index already exists")
+                else:
+                    print(f"⚠️  Error adding {name}: {e}")
+
+        print("Creating 'resume_analysis_cache' table...")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS resume_analysis_cache (
+                cache_key CHAR(64) PRIMARY KEY,
+                analysis_result TEXT NOT NULL,
+                score FLOAT NOT NULL,
+                hits INT NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_resume_cache_last_used (last_used_at)
+            )
+        """)
+        print("✓ 'resume_analysis_cache' table created or already exists")
+
         conn.commit()
         cursor.close()
         conn.close()
@@ -0,0 +1,61 @@
+import os
+import threading
+import time
+
+
+def sweep_uploads(folder, max_age, max_bytes):
+    """Delete uploads older than `max_age` seconds, then the oldest files
+    until the folder holds at most `max_bytes`. Returns the number removed."""
+    now = time.time()
+    entries = []
+    removed = 0
+    for entry in os.scandir(folder):
+        if not entry.is_file():
+            continue
+        try:
+            stat = entry.stat()
+            if now - stat.st_mtime > max_age:
+                os.remove(entry.path)
+                removed += 1
+            else:
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            continue
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            removed += 1
+            total -= size
+        except OSError:
+            continue
+    return removed
+
+
+class UploadSweeper:
+    """Background thread that periodically applies the retention policy."""
+
+    def __init__(self, folder, max_age=7 * 86400, max_bytes=1024 ** 3, interval=600):
+        self.folder = folder
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="upload-sweeper", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                removed = sweep_uploads(self.folder, self.max_age, self.max_bytes)
+                if removed:
+                    print(f"Upload retention removed {removed} file(s) from {self.folder}")
+            except OSError as e:
+                print(f"Upload retention error: {e}")
+            time.sleep(self.interval)
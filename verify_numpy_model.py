@@ -0,0 +1,55 @@
+import json
+import sys
+
+import numpy as np
+
+from bow_encoder import BowEncoder
+from intent_artifacts import current_artifacts
+from numpy_model import NumpyIntentModel
+
+TOLERANCE = 1e-5
+
+
+def verify(h5_path=None, npz_path=None, words_path=None):
+    """Check that the NumPy forward pass matches Keras on the same inputs.
+
+    Paths default to the currently published artifact set (see
+    intent_artifacts.py), so the vocabulary matches both models.
+    """
+    from keras.models import load_model
+
+    artifacts = current_artifacts()
+    h5_path = h5_path or artifacts['model_h5']
+    npz_path = npz_path or artifacts['model_npz']
+    words_path = words_path or artifacts['words']
+
+    print(f"Loading {h5_path} and {npz_path} with {words_path}...")
+    keras_model = load_model(h5_path)
+    numpy_model = NumpyIntentModel.load(npz_path)
+    encoder = BowEncoder.from_pickle(words_path)
+
+    # Every training pattern plus random bags of words
+    with open("intents.json") as file:
+        intents = json.load(file)
+    sentences = [p.lower().split() for intent in intents['intents'] for p in intent['patterns']]
+    rng = np.random.default_rng(0)
+    inputs = np.vstack([
+        encoder.encode_tokens_batch(sentences),
+        (rng.random((256, len(encoder))) < 0.05).astype(np.float32),
+    ])
+
+    expected = keras_model.predict(inputs, verbose=0)
+    actual = numpy_model.predict(inputs)
+    max_error = float(np.abs(expected - actual).max())
+    same_class = float((expected.argmax(axis=1) == actual.argmax(axis=1)).mean())
+
+    print(f"Compared {len(inputs)} inputs: max abs error {max_error:.2e}, top class agreement {same_class:.1%}")
+    if max_error <= TOLERANCE and same_class == 1.0:
+        print("Verification SUCCESS!")
+        return True
+    print("Verification FAILED!")
+    return False
+
+
+if __name__ == "__main__":
+    sys.exit(0 if verify(*sys.argv[1:4]) else 1)